@@ -0,0 +1,28 @@
+"""Add version columns to clients and users
+
+Revision ID: 0a776b2678ac
+Revises: 42939c9c394b
+Create Date: 2026-10-17 09:14:02.663815
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a776b2678ac'
+down_revision: Union[str, None] = '42939c9c394b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('clients', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('users', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'version')
+    op.drop_column('clients', 'version')
@@ -0,0 +1,50 @@
+"""Add outbox_events
+
+Revision ID: 16828f5e2aa9
+Revises: 23d55192d3e0
+Create Date: 2026-10-17 15:02:11.482913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '16828f5e2aa9'
+down_revision: Union[str, None] = '23d55192d3e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'outbox_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('topic', sa.String(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column(
+            'created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'),
+            nullable=False,
+        ),
+        sa.Column(
+            'available_at', sa.DateTime(timezone=True), server_default=sa.text('now()'),
+            nullable=False,
+        ),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('failed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_outbox_events_pending',
+        'outbox_events',
+        ['available_at', 'id'],
+        postgresql_where=sa.text('failed_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_events_pending', table_name='outbox_events')
+    op.drop_table('outbox_events')
@@ -0,0 +1,41 @@
+"""Add clients.change_seq for the change feed
+
+Revision ID: 1cf470e912a8
+Revises: 16828f5e2aa9
+Create Date: 2026-10-17 16:20:37.905164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1cf470e912a8'
+down_revision: Union[str, None] = '16828f5e2aa9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows start at 0, before every transaction id; a constant
+    # default adds the column without rewriting the table.
+    op.add_column(
+        'clients', sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False)
+    )
+    # The application sets change_seq itself; this covers writes from SQL.
+    op.alter_column(
+        'clients', 'change_seq', server_default=sa.text('pg_current_xact_id()::text::bigint')
+    )
+    op.create_index(
+        'ix_clients_created_by_change_seq', 'clients', ['created_by', 'change_seq', 'id'],
+        unique=False,
+    )
+    op.create_index('ix_clients_change_seq', 'clients', ['change_seq', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_clients_change_seq', table_name='clients')
+    op.drop_index('ix_clients_created_by_change_seq', table_name='clients')
+    op.drop_column('clients', 'change_seq')
@@ -0,0 +1,39 @@
+"""Add users.token_version and token revocations
+
+Revision ID: 23d55192d3e0
+Revises: d33dc50fa621
+Create Date: 2026-10-17 12:40:55.107394
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '23d55192d3e0'
+down_revision: Union[str, None] = 'd33dc50fa621'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users', sa.Column('token_version', sa.Integer(), server_default='1', nullable=False)
+    )
+    op.create_table(
+        'token_revocations',
+        sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('token_version', sa.Integer(), nullable=False),
+        sa.Column(
+            'revoked_at', sa.DateTime(timezone=True), server_default=sa.text('now()'),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('token_revocations')
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,31 @@
+"""Add clients (created_by, id) index and drop redundant id indexes
+
+Revision ID: 42939c9c394b
+Revises: d628bf273637
+Create Date: 2026-10-17 07:52:31.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '42939c9c394b'
+down_revision: Union[str, None] = 'd628bf273637'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_clients_created_by_id', 'clients', ['created_by', 'id'], unique=False)
+    # Both duplicate the primary key indexes.
+    op.drop_index('ix_clients_id', table_name='clients')
+    op.drop_index('ix_users_id', table_name='users')
+
+
+def downgrade() -> None:
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+    op.create_index('ix_clients_id', 'clients', ['id'], unique=False)
+    op.drop_index('ix_clients_created_by_id', table_name='clients')
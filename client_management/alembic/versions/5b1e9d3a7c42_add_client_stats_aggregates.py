@@ -0,0 +1,50 @@
+"""Add active client counts and daily client counts
+
+Revision ID: 5b1e9d3a7c42
+Revises: 1cf470e912a8
+Create Date: 2026-10-17 17:45:12.316208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e9d3a7c42'
+down_revision: Union[str, None] = '1cf470e912a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'client_counts', sa.Column('active', sa.Integer(), server_default='0', nullable=False)
+    )
+    op.execute(
+        'UPDATE client_counts SET active = live.active '
+        'FROM (SELECT created_by, count(*) AS active FROM clients '
+        'WHERE deleted_at IS NULL AND is_active GROUP BY created_by) AS live '
+        'WHERE client_counts.owner_id = live.created_by'
+    )
+    op.create_table(
+        'client_daily_counts',
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('created', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('owner_id', 'day'),
+    )
+    op.create_index('ix_client_daily_counts_day', 'client_daily_counts', ['day'], unique=False)
+    op.execute(
+        "INSERT INTO client_daily_counts (owner_id, day, created) "
+        "SELECT created_by, (created_at AT TIME ZONE 'UTC')::date, count(*) FROM clients "
+        "WHERE deleted_at IS NULL AND created_by IS NOT NULL GROUP BY 1, 2"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_client_daily_counts_day', table_name='client_daily_counts')
+    op.drop_table('client_daily_counts')
+    op.drop_column('client_counts', 'active')
@@ -0,0 +1,37 @@
+"""Add per-owner client counts
+
+Revision ID: d33dc50fa621
+Revises: dcece8d749b1
+Create Date: 2026-10-17 11:21:09.540112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd33dc50fa621'
+down_revision: Union[str, None] = 'dcece8d749b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'client_counts',
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('owner_id'),
+    )
+    op.execute(
+        'INSERT INTO client_counts (owner_id, count) '
+        'SELECT created_by, count(*) FROM clients '
+        'WHERE deleted_at IS NULL AND created_by IS NOT NULL GROUP BY created_by'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('client_counts')
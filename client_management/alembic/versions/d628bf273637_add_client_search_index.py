@@ -0,0 +1,37 @@
+"""Add client full-text search column and index
+
+Revision ID: d628bf273637
+Revises: b6930473c5e2
+Create Date: 2026-10-17 06:40:12.511834
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd628bf273637'
+down_revision: Union[str, None] = 'b6930473c5e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A stored generated column rather than an expression index, so that
+    # index rechecks and ts_rank read the tsvector instead of rebuilding it
+    # for every candidate row. Adding it rewrites the table.
+    op.execute(
+        "ALTER TABLE clients ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(email, '') || ' ' "
+        "|| coalesce(phone, '') || ' ' || coalesce(notes, ''))) STORED"
+    )
+    op.create_index(
+        'ix_clients_search', 'clients', ['search_vector'], unique=False, postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_clients_search', table_name='clients')
+    op.drop_column('clients', 'search_vector')
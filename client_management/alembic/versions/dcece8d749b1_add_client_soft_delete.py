@@ -0,0 +1,62 @@
+"""Add clients.deleted_at and make client indexes partial on live rows
+
+Revision ID: dcece8d749b1
+Revises: 0a776b2678ac
+Create Date: 2026-10-17 10:02:47.318260
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'dcece8d749b1'
+down_revision: Union[str, None] = '0a776b2678ac'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE = sa.text('deleted_at IS NULL')
+
+
+def upgrade() -> None:
+    op.add_column('clients', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    # Deleted clients are left out of the lookup indexes, so they neither
+    # grow them nor block reuse of their email.
+    op.drop_index('ix_clients_email', table_name='clients')
+    op.drop_index('ix_clients_name', table_name='clients')
+    op.drop_index('ix_clients_created_by_id', table_name='clients')
+    op.drop_index('ix_clients_search', table_name='clients')
+    op.create_index('ix_clients_email', 'clients', ['email'], unique=True, postgresql_where=LIVE)
+    op.create_index('ix_clients_name', 'clients', ['name'], unique=False, postgresql_where=LIVE)
+    op.create_index(
+        'ix_clients_created_by_id', 'clients', ['created_by', 'id'], unique=False,
+        postgresql_where=LIVE,
+    )
+    op.create_index(
+        'ix_clients_search', 'clients', ['search_vector'], unique=False,
+        postgresql_using='gin', postgresql_where=LIVE,
+    )
+    # Used by the purge job to find old tombstones.
+    op.create_index(
+        'ix_clients_deleted_at', 'clients', ['deleted_at'], unique=False,
+        postgresql_where=sa.text('deleted_at IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    # Tombstones would collide with live rows in the full unique index.
+    op.execute('DELETE FROM clients WHERE deleted_at IS NOT NULL')
+    op.drop_index('ix_clients_deleted_at', table_name='clients')
+    op.drop_index('ix_clients_search', table_name='clients')
+    op.drop_index('ix_clients_created_by_id', table_name='clients')
+    op.drop_index('ix_clients_name', table_name='clients')
+    op.drop_index('ix_clients_email', table_name='clients')
+    op.create_index(
+        'ix_clients_search', 'clients', ['search_vector'], unique=False, postgresql_using='gin'
+    )
+    op.create_index('ix_clients_created_by_id', 'clients', ['created_by', 'id'], unique=False)
+    op.create_index('ix_clients_name', 'clients', ['name'], unique=False)
+    op.create_index('ix_clients_email', 'clients', ['email'], unique=True)
+    op.drop_column('clients', 'deleted_at')
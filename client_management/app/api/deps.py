@@ -1,4 +1,4 @@
-from typing import Generator
+from typing import Any, Dict, Generator, Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -8,30 +8,51 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models, schemas
 from app.core import security
+from app.core.cache import principal_cache
 from app.core.config import settings
-from app.db.session import get_db
+from app.core.security import token_revocations
+from app.db.session import get_db, get_read_db
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
 
 
-async def get_current_user(
-    db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> models.User:
+def _decode_token(token: str) -> Tuple[Dict[str, Any], schemas.TokenPayload]:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=["HS256"]
         )
-        token_data = schemas.TokenPayload(**payload)
+        return payload, schemas.TokenPayload(**payload)
     except (jwt.JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
+
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)
+) -> models.User:
+    snapshot = principal_cache.get(token)
+    if snapshot is not None:
+        return crud.user.from_snapshot(snapshot)
+    payload, token_data = _decode_token(token)
     user = await crud.user.get(db, id=token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    # Revocations only apply to STATELESS_AUTH, whose tokens can't be
+    # checked against the user row on every request
+    if (
+        settings.STATELESS_AUTH
+        and token_data.ver is not None
+        and token_data.ver < user.token_version
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+    principal_cache.set(token, crud.user.snapshot(user), expires_at=payload["exp"])
     return user
 
 
@@ -50,4 +71,71 @@ async def get_current_active_superuser(
         raise HTTPException(
             status_code=400, detail="The user doesn't have enough privileges"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+class Principal:
+    """
+    The caller of a request, for endpoints that only need its id and roles.
+    With STATELESS_AUTH these come from the token's claims; `get_user` loads
+    the full row only when asked.
+    """
+
+    def __init__(
+        self,
+        id: int,
+        is_active: bool,
+        is_superuser: bool,
+        db: AsyncSession,
+        user: Optional[models.User] = None,
+    ):
+        self.id = id
+        self.is_active = is_active
+        self.is_superuser = is_superuser
+        self._db = db
+        self._user = user
+
+    async def get_user(self) -> models.User:
+        if self._user is None:
+            self._user = await crud.user.get(self._db, id=self.id)
+            if self._user is None:
+                raise HTTPException(status_code=404, detail="User not found")
+        return self._user
+
+
+async def get_current_principal(
+    db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)
+) -> Principal:
+    if settings.STATELESS_AUTH:
+        _, token_data = _decode_token(token)
+        claims = (token_data.sub, token_data.act, token_data.su, token_data.ver)
+        # Tokens issued without the claims are checked against the database.
+        if None not in claims:
+            if token_revocations.stale:
+                await token_revocations.refresh(lambda: crud.user.revocations(db))
+            if token_revocations.is_revoked(token_data.sub, token_data.ver):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Could not validate credentials",
+                )
+            return Principal(token_data.sub, token_data.act, token_data.su, db)
+    user = await get_current_user(db, token)
+    return Principal(user.id, user.is_active, user.is_superuser, db, user=user)
+
+
+async def get_current_active_principal(
+    principal: Principal = Depends(get_current_principal),
+) -> Principal:
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return principal
+
+
+async def get_current_active_superuser_principal(
+    principal: Principal = Depends(get_current_principal),
+) -> Principal:
+    if not principal.is_superuser:
+        raise HTTPException(
+            status_code=400, detail="The user doesn't have enough privileges"
+        )
+    return principal
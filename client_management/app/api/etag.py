@@ -0,0 +1,37 @@
+from typing import Any, List, Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(obj: Any) -> str:
+    """
+    Strong ETag of a row: its id and version, which every update bumps.
+    """
+    return f'"{obj.id}-{obj.version}"'
+
+
+def _parse(header: Optional[str]) -> List[str]:
+    if not header:
+        return []
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """
+    Whether `If-None-Match` matches `etag`, using weak comparison.
+    """
+    tags = _parse(request.headers.get("if-none-match"))
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def precondition_failed(request: Request, etag: str) -> bool:
+    """
+    Whether an `If-Match` header is present and does not match `etag`, using
+    strong comparison (weak tags never match).
+    """
+    tags = _parse(request.headers.get("if-match"))
+    return bool(tags) and "*" not in tags and etag not in tags
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,86 @@
+import json
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import TypedDict
+
+from app import schemas
+from app.core.cache import response_cache
+from app.core.config import settings
+
+
+class RowSerializer:
+    """
+    Dumps ORM rows to JSON in the shape of a response schema without building
+    a schema instance per row. The rows are read into dicts that a TypeAdapter
+    precompiled from the schema's fields serializes in the Rust core, which
+    produces the same bytes FastAPI's `response_model` path does, minus its
+    validation. Only for flat schemas whose fields are plain row attributes.
+    """
+
+    def __init__(self, schema: Type[BaseModel]):
+        fields = schema.model_fields
+        self.fields = [(field.alias or name, name) for name, field in fields.items()]
+        row_type = TypedDict(
+            f"{schema.__name__}Row",
+            {field.alias or name: field.annotation for name, field in fields.items()},
+        )
+        self._one = TypeAdapter(row_type)
+        self._many = TypeAdapter(List[row_type])
+        self._validated_many = TypeAdapter(List[schema])
+
+    def to_dict(self, obj: Any) -> dict:
+        return {key: getattr(obj, name) for key, name in self.fields}
+
+    def dump(self, obj: Any) -> bytes:
+        return self._one.dump_json(self.to_dict(obj))
+
+    def dump_many(self, objs: Iterable[Any]) -> bytes:
+        return self._many.dump_json([self.to_dict(obj) for obj in objs])
+
+    def render_many(self, objs: Sequence[Any]) -> bytes:
+        """
+        Dump `objs` the way the endpoint's response model would: directly with
+        FAST_SERIALIZATION, through validation otherwise.
+        """
+        if settings.FAST_SERIALIZATION:
+            return self.dump_many(objs)
+        adapter = self._validated_many
+        return adapter.dump_json(adapter.validate_python(objs, from_attributes=True))
+
+
+client_serializer = RowSerializer(schemas.Client)
+user_serializer = RowSerializer(schemas.User)
+
+
+def json_response(content: bytes, response: Optional[Response] = None) -> Response:
+    """
+    Wrap serialized JSON in a response, carrying over the headers set on the
+    endpoint's injected `response`, as FastAPI does for returned values.
+    """
+    result = Response(content=content, media_type="application/json")
+    if response is not None:
+        result.headers.raw.extend(response.headers.raw)
+    return result
+
+
+async def cached_json_response(
+    request: Request,
+    generations: Sequence[str],
+    render: Callable[[], Awaitable[Tuple[bytes, Dict[str, str]]]],
+) -> Response:
+    """
+    Serve the JSON body and headers produced by `render` from the response
+    cache, keyed on the request path and query parameters. `generations` name
+    the data the response is built from (and so also scope it to the caller).
+    """
+    async def compute() -> bytes:
+        body, headers = await render()
+        return json.dumps(headers).encode() + b"\n" + body
+
+    key = request.url.path + "?" + urlencode(sorted(request.query_params.multi_items()))
+    envelope = await response_cache.get_or_set(key, generations, compute)
+    headers, body = envelope.split(b"\n", 1)
+    return Response(content=body, media_type="application/json", headers=json.loads(headers))
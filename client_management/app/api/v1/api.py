@@ -1,8 +1,9 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, clients, users
+from app.api.v1.endpoints import auth, clients, metrics, users
 
 api_router = APIRouter()
 api_router.include_router(auth.router, tags=["auth"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
-api_router.include_router(clients.router, prefix="/clients", tags=["clients"])
\ No newline at end of file
+api_router.include_router(clients.router, prefix="/clients", tags=["clients"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
\ No newline at end of file
@@ -7,13 +7,18 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models, schemas
 from app.api import deps
+from app.api.rate_limit import RateLimit
 from app.core import security
 from app.core.config import settings
 
 router = APIRouter()
 
 
-@router.post("/login/access-token", response_model=schemas.Token)
+@router.post(
+    "/login/access-token",
+    response_model=schemas.Token,
+    dependencies=[Depends(RateLimit("login"))],
+)
 async def login_access_token(
     db: AsyncSession = Depends(deps.get_db), form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
@@ -30,13 +35,15 @@ async def login_access_token(
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return {
         "access_token": security.create_access_token(
-            user.id, expires_delta=access_token_expires
+            user.id, expires_delta=access_token_expires, claims=crud.user.token_claims(user)
         ),
         "token_type": "bearer",
     }
 
 
-@router.post("/register", response_model=schemas.User)
+@router.post(
+    "/register", response_model=schemas.User, dependencies=[Depends(RateLimit("register"))]
+)
 async def register_new_user(
     *,
     db: AsyncSession = Depends(deps.get_db),
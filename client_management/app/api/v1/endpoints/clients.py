@@ -1,39 +1,258 @@
-from typing import Any, List
+import codecs
+import csv
+import io
+import json
+import time
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models, schemas
 from app.api import deps
+from app.api.etag import make_etag, not_modified, not_modified_response, precondition_failed
+from app.api.rate_limit import RateLimit
+from app.api.serialization import cached_json_response, client_serializer, json_response
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.crud.client import SEARCH_MIN_TERM_LENGTH
 
 router = APIRouter()
 
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+EXPORT_BATCH_SIZE = 500
+
+
+async def _list_clients(
+    db: AsyncSession, user: deps.Principal, *, skip: int, limit: int, cursor: Optional[str]
+) -> Tuple[List[models.Client], Optional[str]]:
+    if cursor is not None:
+        try:
+            if crud.user.is_superuser(user):
+                return await crud.client.get_page(db, cursor=cursor, limit=limit)
+            return await crud.client.get_page_by_owner(
+                db=db, owner_id=user.id, cursor=cursor, limit=limit
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    if crud.user.is_superuser(user):
+        return await crud.client.get_multi(db, skip=skip, limit=limit), None
+    clients = await crud.client.get_multi_by_owner(
+        db=db, owner_id=user.id, skip=skip, limit=limit
+    )
+    return clients, None
+
+
+async def _count_clients(
+    db: AsyncSession, user: deps.Principal, count: Literal["none", "estimate", "exact"]
+) -> Dict[str, str]:
+    """
+    Total headers of a client listing: `X-Total-Count` and whether it is an
+    `estimate`, `exact` or a `lower-bound` (an exact count past its cap).
+    """
+    if count == "none":
+        return {}
+    owner_id = None if crud.user.is_superuser(user) else user.id
+    if count == "estimate":
+        total = await crud.client.count_estimate(db, owner_id=owner_id)
+        kind = "estimate"
+    else:
+        cap = settings.CLIENT_COUNT_EXACT_CAP
+        total = await crud.client.count(db, owner_id=owner_id, cap=cap)
+        kind = "exact"
+        if total > cap:
+            total, kind = cap, "lower-bound"
+    return {"X-Total-Count": str(total), "X-Total-Count-Type": kind}
+
 
 @router.get("/", response_model=List[schemas.Client])
 async def read_clients(
-    db: AsyncSession = Depends(deps.get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_read_db),
+    # Cache misses are filled from the primary: a page read from a lagging
+    # replica would otherwise be cached and served to every caller
+    primary_db: AsyncSession = Depends(deps.get_db),
     skip: int = 0,
-    limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    count: Literal["none", "estimate", "exact"] = "none",
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Retrieve clients.
+
+    Pass `cursor` (empty for the first page) to page by keyset instead of
+    `skip`; the cursor of the next page is returned in the `X-Next-Cursor`
+    header.
+
+    Pass `count` to get the total in the `X-Total-Count` header: `estimate`
+    is cheap at any size, `exact` counts up to CLIENT_COUNT_EXACT_CAP rows.
     """
-    if crud.user.is_superuser(current_user):
-        clients = await crud.client.get_multi(db, skip=skip, limit=limit)
-    else:
-        clients = await crud.client.get_multi_by_owner(
-            db=db, owner_id=current_user.id, skip=skip, limit=limit
+    if settings.RESPONSE_CACHE_ENABLED:
+        async def render() -> Tuple[bytes, Dict[str, str]]:
+            clients, next_cursor = await _list_clients(
+                primary_db, current_user, skip=skip, limit=limit, cursor=cursor
+            )
+            headers = await _count_clients(primary_db, current_user, count)
+            if next_cursor:
+                headers["X-Next-Cursor"] = next_cursor
+            return client_serializer.render_many(clients), headers
+
+        return await cached_json_response(
+            request, [crud.client.cache_generation(current_user)], render
         )
+
+    clients, next_cursor = await _list_clients(
+        db, current_user, skip=skip, limit=limit, cursor=cursor
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers.update(await _count_clients(db, current_user, count))
+    if settings.FAST_SERIALIZATION:
+        return json_response(client_serializer.dump_many(clients), response)
     return clients
 
 
+@router.get("/search", response_model=List[schemas.Client])
+async def search_clients(
+    db: AsyncSession = Depends(deps.get_read_db),
+    q: str = Query(..., min_length=SEARCH_MIN_TERM_LENGTH, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
+) -> Any:
+    """
+    Search clients by name, email, phone and notes, best matches first.
+    """
+    owner_id = None if crud.user.is_superuser(current_user) else current_user.id
+    clients = await crud.client.search(db, q=q, owner_id=owner_id, limit=limit)
+    if settings.FAST_SERIALIZATION:
+        return json_response(client_serializer.dump_many(clients))
+    return clients
+
+
+@router.get("/stats", response_model=schemas.ClientStats)
+async def read_client_stats(
+    db: AsyncSession = Depends(deps.get_read_db),
+    owner_id: Optional[int] = None,
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
+) -> Any:
+    """
+    Totals of the caller's clients: active and inactive, and how many were
+    added this week and month. Superusers get them across all owners, or for
+    `owner_id`.
+    """
+    if not crud.user.is_superuser(current_user):
+        if owner_id is not None and owner_id != current_user.id:
+            raise HTTPException(status_code=400, detail="Not enough permissions")
+        owner_id = current_user.id
+    return await crud.client.stats(db, owner_id=owner_id)
+
+
+@router.get("/changes", response_model=schemas.ClientChangeFeed)
+async def read_client_changes(
+    # The hold-back of in-progress writes needs the primary's snapshot
+    db: AsyncSession = Depends(deps.get_db),
+    since: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
+) -> Any:
+    """
+    Clients created, updated or deleted since the `since` token of a previous
+    page, oldest change first; without it, every client from the start.
+
+    Pass the returned `since` to the next call, also when no changes were
+    returned. Deleted clients appear as such until their tombstone is
+    purged: a token older than CLIENT_PURGE_AFTER_DAYS fails with 410, and
+    the mirror has to be rebuilt from the start. Without CLIENT_SOFT_DELETE
+    deletes leave no tombstone, so the feed is not served (404).
+    """
+    if not settings.CLIENT_SOFT_DELETE:
+        raise HTTPException(status_code=404, detail="Change feed needs CLIENT_SOFT_DELETE")
+    now = int(time.time())
+    after, synced_at = (0, 0), now
+    if since:
+        try:
+            token = decode_cursor(since)
+            after, synced_at = (token["seq"], token["id"]), token["at"]
+            if not all(isinstance(value, int) for value in (*after, synced_at)):
+                raise ValueError
+        except (KeyError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid change token")
+        if synced_at < now - settings.CLIENT_PURGE_AFTER_DAYS * 86400:
+            raise HTTPException(status_code=410, detail="Change token expired")
+
+    owner_id = None if crud.user.is_superuser(current_user) else current_user.id
+    clients = await crud.client.changes(db, owner_id=owner_id, after=after, limit=limit)
+    more = len(clients) > limit
+    clients = clients[:limit]
+    if clients:
+        after = (clients[-1].change_seq, clients[-1].id)
+    # A reader that is caught up has seen every delete until now; one still
+    # paging has only seen those until it started.
+    token = {"seq": after[0], "id": after[1], "at": synced_at if more else now}
+    changes = [
+        {"id": c.id, "deleted": True} if c.deleted_at is not None
+        else {"id": c.id, "deleted": False, "client": c}
+        for c in clients
+    ]
+    return {"changes": changes, "since": encode_cursor(token), "more": more}
+
+
+async def _export_ndjson(clients: AsyncIterator[models.Client]) -> AsyncIterator[str]:
+    lines = []
+    async for client in clients:
+        lines.append(schemas.Client.model_validate(client).model_dump_json())
+        if len(lines) >= EXPORT_BATCH_SIZE:
+            yield "\n".join(lines) + "\n"
+            lines.clear()
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+async def _export_csv(clients: AsyncIterator[models.Client]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(schemas.Client.model_fields))
+    writer.writeheader()
+    rows = 0
+    async for client in clients:
+        writer.writerow(schemas.Client.model_validate(client).model_dump(mode="json"))
+        rows += 1
+        if rows % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue()
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_clients(
+    db: AsyncSession = Depends(deps.get_read_db),
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
+) -> Any:
+    """
+    Stream all visible clients as NDJSON or CSV without buffering the result.
+    """
+    owner_id = None if crud.user.is_superuser(current_user) else current_user.id
+    clients = crud.client.stream(db, owner_id=owner_id, batch_size=EXPORT_BATCH_SIZE)
+    if format == "csv":
+        return StreamingResponse(
+            _export_csv(clients),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="clients.csv"'},
+        )
+    return StreamingResponse(_export_ndjson(clients), media_type="application/x-ndjson")
+
+
 @router.post("/", response_model=schemas.Client)
 async def create_client(
     *,
     db: AsyncSession = Depends(deps.get_db),
     client_in: schemas.ClientCreate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Create new client.
@@ -48,21 +267,229 @@ async def create_client(
     return client
 
 
+async def _iter_lines(request: Request) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def _iter_csv_records(request: Request) -> AsyncIterator[Dict[str, Any]]:
+    header = None
+    record = ""
+    async for line in _iter_lines(request):
+        record = f"{record}\n{line}" if record else line
+        # A quoted field may span lines: wait until the quotes are balanced.
+        if record.count('"') % 2:
+            continue
+        values = next(csv.reader([record]), [])
+        record = ""
+        if header is None:
+            header = [name.strip() for name in values]
+        elif values:
+            yield {name: value for name, value in zip(header, values) if value != ""}
+
+
+async def _iter_bulk_rows(request: Request) -> AsyncIterator[Tuple[Any, Optional[str]]]:
+    """
+    Yield `(row, error)` for every row of a bulk import body.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type == "application/json":
+        try:
+            rows = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of clients")
+        for row in rows:
+            yield row, None
+    elif content_type in NDJSON_MEDIA_TYPES:
+        async for line in _iter_lines(request):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line), None
+            except ValueError:
+                yield None, "Invalid JSON"
+    elif content_type == "text/csv":
+        async for row in _iter_csv_records(request):
+            yield row, None
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail="Expected application/json, application/x-ndjson or text/csv",
+        )
+
+
+@router.post(
+    "/bulk",
+    response_model=schemas.ClientBulkResult,
+    dependencies=[Depends(RateLimit("clients_bulk", per="principal"))],
+)
+async def create_clients_bulk(
+    *,
+    request: Request,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
+) -> Any:
+    """
+    Import clients from a JSON array, an NDJSON stream or a CSV stream with a
+    header row. Rows are inserted in batches; existing emails are reported as
+    duplicates instead of failing the import.
+    """
+    report = schemas.ClientBulkResult()
+    batch: List[Tuple[int, schemas.ClientCreate]] = []
+
+    async def flush() -> None:
+        ids = await crud.client.create_many(
+            db, objs_in=[client_in for _, client_in in batch], created_by=current_user.id
+        )
+        for (row_number, client_in), client_id in zip(batch, ids):
+            status = "created" if client_id is not None else "duplicate"
+            report.rows.append(
+                schemas.ClientBulkRow(
+                    row=row_number, status=status, id=client_id, email=client_in.email
+                )
+            )
+        batch.clear()
+
+    row_number = 0
+    async for row, error in _iter_bulk_rows(request):
+        row_number += 1
+        if error is None:
+            try:
+                batch.append((row_number, schemas.ClientCreate.model_validate(row)))
+            except ValidationError as e:
+                error = "; ".join(
+                    f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}"
+                    for err in e.errors()
+                )
+        if error is not None:
+            report.rows.append(schemas.ClientBulkRow(row=row_number, status="invalid", detail=error))
+        if len(batch) >= settings.BULK_IMPORT_BATCH_SIZE:
+            await flush()
+    if batch:
+        await flush()
+
+    report.rows.sort(key=lambda result: result.row)
+    for result in report.rows:
+        if result.status == "created":
+            report.created += 1
+        elif result.status == "duplicate":
+            report.duplicates += 1
+        else:
+            report.invalid += 1
+    return report
+
+
+@router.patch(
+    "/bulk",
+    response_model=schemas.ClientBulkWriteResult,
+    dependencies=[Depends(RateLimit("clients_bulk", per="principal"))],
+)
+async def update_clients_bulk(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    update_in: schemas.ClientBulkUpdate,
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
+) -> Any:
+    """
+    Apply the same changes to the clients given by `ids` or matching `filter`,
+    e.g. `{"filter": {"is_active": true}, "changes": {"is_active": false}}`.
+    Only the caller's clients are affected, unless they are a superuser.
+    """
+    changes = update_in.changes.model_dump(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No changes given")
+    owner_id = None if crud.user.is_superuser(current_user) else current_user.id
+    affected, chunks = await crud.client.update_many(
+        db,
+        changes=changes,
+        ids=update_in.ids,
+        filter=update_in.filter,
+        owner_id=owner_id,
+        chunk_size=settings.BULK_WRITE_CHUNK_SIZE,
+    )
+    return {"affected": affected, "chunks": chunks}
+
+
+@router.delete(
+    "/bulk",
+    response_model=schemas.ClientBulkWriteResult,
+    dependencies=[Depends(RateLimit("clients_bulk", per="principal"))],
+)
+async def delete_clients_bulk(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    selection: schemas.ClientBulkSelection,
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
+) -> Any:
+    """
+    Delete the clients given by `ids` or matching `filter`. Only the caller's
+    clients are affected, unless they are a superuser.
+    """
+    owner_id = None if crud.user.is_superuser(current_user) else current_user.id
+    affected, chunks = await crud.client.remove_many(
+        db,
+        ids=selection.ids,
+        filter=selection.filter,
+        owner_id=owner_id,
+        chunk_size=settings.BULK_WRITE_CHUNK_SIZE,
+    )
+    return {"affected": affected, "chunks": chunks}
+
+
+@router.post("/batch-get", response_model=schemas.ClientBatchResult)
+async def read_clients_batch(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    batch_in: schemas.ClientBatchGet,
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
+) -> Any:
+    """
+    Get up to 1000 clients by id in one query, in the order requested.
+
+    Ids that do not exist or belong to another user are listed in `missing`.
+    """
+    owner_id = None if crud.user.is_superuser(current_user) else current_user.id
+    clients = await crud.client.get_many(db, batch_in.ids, owner_id=owner_id)
+    found = {client.id for client in clients}
+    missing = [id for id in dict.fromkeys(batch_in.ids) if id not in found]
+    return {"clients": clients, "missing": missing}
+
+
 @router.get("/{client_id}", response_model=schemas.Client)
 async def read_client(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     client_id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    request: Request,
+    response: Response,
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get client by ID.
+
+    Returns 304 without a body when `If-None-Match` carries the current ETag.
     """
     client = await crud.client.get(db=db, id=client_id)
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     if not crud.user.is_superuser(current_user) and (client.created_by != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
+    etag = make_etag(client)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
+    if settings.FAST_SERIALIZATION:
+        return json_response(client_serializer.dump(client), response)
     return client
 
 
@@ -72,17 +499,31 @@ async def update_client(
     db: AsyncSession = Depends(deps.get_db),
     client_id: int,
     client_in: schemas.ClientUpdate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    request: Request,
+    response: Response,
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Update a client.
+
+    With `If-Match`, the update only applies if the client still has that
+    ETag, and fails with 412 otherwise.
     """
     client = await crud.client.get(db=db, id=client_id)
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     if not crud.user.is_superuser(current_user) and (client.created_by != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
-    client = await crud.client.update(db=db, db_obj=client, obj_in=client_in)
+    if precondition_failed(request, make_etag(client)):
+        raise HTTPException(status_code=412, detail="Client was modified")
+    version = client.version if "if-match" in request.headers else None
+    client = await crud.client.update(db=db, db_obj=client, obj_in=client_in, version=version)
+    if client is None:
+        # Without If-Match, the update only misses a client deleted meanwhile
+        if version is None:
+            raise HTTPException(status_code=404, detail="Client not found")
+        raise HTTPException(status_code=412, detail="Client was modified")
+    response.headers["ETag"] = make_etag(client)
     return client
 
 
@@ -91,7 +532,7 @@ async def delete_client(
     *,
     db: AsyncSession = Depends(deps.get_db),
     client_id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Delete a client.
@@ -102,4 +543,7 @@ async def delete_client(
     if not crud.user.is_superuser(current_user) and (client.created_by != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
     client = await crud.client.remove(db=db, id=client_id)
+    if client is None:
+        # Deleted by another request since it was loaded
+        raise HTTPException(status_code=404, detail="Client not found")
     return client
\ No newline at end of file
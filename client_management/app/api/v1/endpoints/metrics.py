@@ -0,0 +1,46 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.core import security
+from app.core.cache import principal_cache, response_cache
+from app.core.instrumentation import render_prometheus
+from app.core.rate_limit import rate_limiter
+from app.db import session
+from app.jobs.outbox import outbox_worker
+
+router = APIRouter()
+
+
+@router.get("/")
+async def read_metrics(
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser_principal),
+) -> Any:
+    """
+    Runtime metrics of the worker serving the request.
+    """
+    return {
+        "db_pool": session.pool_status(),
+        "db_replicas": session.replicas.status(),
+        "password_hashing": security.password_pool.stats(),
+        "principal_cache": principal_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "rate_limits": rate_limiter.stats(),
+        "token_revocations": security.token_revocations.stats(),
+        "outbox": {**outbox_worker.stats(), **await outbox_worker.backlog(db)},
+    }
+
+
+@router.get("/prometheus", response_class=PlainTextResponse)
+async def read_prometheus_metrics(
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser_principal),
+) -> Any:
+    """
+    Per-route request, SQL time and statement count histograms of this
+    worker, in the Prometheus text format.
+    """
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -1,38 +1,84 @@
-from typing import Any, List
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
 from fastapi.encoders import jsonable_encoder
 from pydantic import EmailStr
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models, schemas
 from app.api import deps
+from app.api.etag import make_etag, not_modified, not_modified_response, precondition_failed
+from app.api.serialization import cached_json_response, json_response, user_serializer
 from app.core.config import settings
 
 router = APIRouter()
 
 
+async def _list_users(
+    db: AsyncSession, *, skip: int, limit: int, cursor: Optional[str]
+) -> Tuple[List[models.User], Optional[str]]:
+    if cursor is None:
+        return await crud.user.get_multi(db, skip=skip, limit=limit), None
+    try:
+        return await crud.user.get_page(db, cursor=cursor, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/", response_model=List[schemas.User])
 async def read_users(
-    db: AsyncSession = Depends(deps.get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_read_db),
+    # Cache misses are filled from the primary, see read_clients
+    primary_db: AsyncSession = Depends(deps.get_db),
     skip: int = 0,
-    limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_superuser),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser_principal),
 ) -> Any:
     """
     Retrieve users.
+
+    Pass `cursor` (empty for the first page) to page by keyset instead of
+    `skip`; the cursor of the next page is returned in the `X-Next-Cursor`
+    header.
     """
-    users = await crud.user.get_multi(db, skip=skip, limit=limit)
+    if settings.RESPONSE_CACHE_ENABLED:
+        async def render() -> Tuple[bytes, Dict[str, str]]:
+            users, next_cursor = await _list_users(
+                primary_db, skip=skip, limit=limit, cursor=cursor
+            )
+            headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+            return user_serializer.render_many(users), headers
+
+        return await cached_json_response(request, ["users"], render)
+
+    users, next_cursor = await _list_users(db, skip=skip, limit=limit, cursor=cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if settings.FAST_SERIALIZATION:
+        return json_response(user_serializer.dump_many(users), response)
     return users
 
 
 @router.get("/me", response_model=schemas.User)
 async def read_user_me(
+    request: Request,
+    response: Response,
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Get current user.
+
+    Returns 304 without a body when `If-None-Match` carries the current ETag.
     """
+    etag = make_etag(current_user)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
+    if settings.FAST_SERIALIZATION:
+        return json_response(user_serializer.dump(current_user), response)
     return current_user
 
 
@@ -43,11 +89,18 @@ async def update_user_me(
     password: str = Body(None),
     full_name: str = Body(None),
     email: EmailStr = Body(None),
+    request: Request,
+    response: Response,
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Update own user.
+
+    With `If-Match`, the update only applies if the user still has that ETag,
+    and fails with 412 otherwise.
     """
+    if precondition_failed(request, make_etag(current_user)):
+        raise HTTPException(status_code=412, detail="User was modified")
     current_user_data = jsonable_encoder(current_user)
     user_in = schemas.UserUpdate(**current_user_data)
     if password is not None:
@@ -56,26 +109,40 @@ async def update_user_me(
         user_in.full_name = full_name
     if email is not None:
         user_in.email = email
-    user = await crud.user.update(db, db_obj=current_user, obj_in=user_in)
+    version = current_user.version if "if-match" in request.headers else None
+    user = await crud.user.update(db, db_obj=current_user, obj_in=user_in, version=version)
+    if user is None:
+        # Without If-Match, the update only misses a user deleted meanwhile
+        if version is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        raise HTTPException(status_code=412, detail="User was modified")
+    response.headers["ETag"] = make_etag(user)
     return user
 
 
 @router.get("/{user_id}", response_model=schemas.User)
 async def read_user_by_id(
     user_id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
-    db: AsyncSession = Depends(deps.get_db),
+    request: Request,
+    response: Response,
+    current_user: deps.Principal = Depends(deps.get_current_active_principal),
+    db: AsyncSession = Depends(deps.get_read_db),
 ) -> Any:
     """
     Get a specific user by id.
     """
     user = await crud.user.get(db, id=user_id)
-    if user == current_user:
-        return user
-    if not crud.user.is_superuser(current_user):
+    if not (user and user.id == current_user.id) and not crud.user.is_superuser(current_user):
         raise HTTPException(
             status_code=400, detail="The user doesn't have enough privileges"
         )
+    if user:
+        etag = make_etag(user)
+        if not_modified(request, etag):
+            return not_modified_response(etag)
+        response.headers["ETag"] = etag
+        if settings.FAST_SERIALIZATION:
+            return json_response(user_serializer.dump(user), response)
     return user
 
 
@@ -85,10 +152,15 @@ async def update_user(
     db: AsyncSession = Depends(deps.get_db),
     user_id: int,
     user_in: schemas.UserUpdate,
-    current_user: models.User = Depends(deps.get_current_active_superuser),
+    request: Request,
+    response: Response,
+    current_user: deps.Principal = Depends(deps.get_current_active_superuser_principal),
 ) -> Any:
     """
     Update a user.
+
+    With `If-Match`, the update only applies if the user still has that ETag,
+    and fails with 412 otherwise.
     """
     user = await crud.user.get(db, id=user_id)
     if not user:
@@ -96,5 +168,17 @@ async def update_user(
             status_code=404,
             detail="The user with this id does not exist in the system",
         )
-    user = await crud.user.update(db, db_obj=user, obj_in=user_in)
+    if precondition_failed(request, make_etag(user)):
+        raise HTTPException(status_code=412, detail="User was modified")
+    version = user.version if "if-match" in request.headers else None
+    user = await crud.user.update(db, db_obj=user, obj_in=user_in, version=version)
+    if user is None:
+        # Without If-Match, the update only misses a user deleted meanwhile
+        if version is None:
+            raise HTTPException(
+                status_code=404,
+                detail="The user with this id does not exist in the system",
+            )
+        raise HTTPException(status_code=412, detail="User was modified")
+    response.headers["ETag"] = make_etag(user)
     return user
\ No newline at end of file
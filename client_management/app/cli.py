@@ -0,0 +1,59 @@
+"""
+Management commands:
+
+    python -m app.cli bootstrap [--create-tables]
+    python -m app.cli openapi [--output openapi.json]
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+
+async def bootstrap(create_tables: bool) -> None:
+    from app.db import init_db
+    from app.db.session import AsyncSessionLocal, engine
+
+    try:
+        if create_tables:
+            await init_db.create_tables(engine)
+        superuser = await init_db.create_first_superuser(AsyncSessionLocal)
+    finally:
+        await engine.dispose()
+    print("Created the first superuser" if superuser else "The first superuser already exists")
+
+
+def openapi(output: str) -> None:
+    from app.main import app
+
+    schema = json.dumps(app.openapi(), separators=(",", ":"))
+    if output == "-":
+        sys.stdout.write(schema + "\n")
+    else:
+        with open(output, "w") as f:
+            f.write(schema)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+    bootstrap_parser = commands.add_parser(
+        "bootstrap", help="Create the first superuser (after `alembic upgrade head`)"
+    )
+    bootstrap_parser.add_argument(
+        "--create-tables", action="store_true", help="Also create missing tables, without Alembic"
+    )
+    openapi_parser = commands.add_parser(
+        "openapi", help="Write the OpenAPI schema, for OPENAPI_SCHEMA_FILE"
+    )
+    openapi_parser.add_argument("--output", default="openapi.json", help="File, or - for stdout")
+    args = parser.parse_args()
+
+    if args.command == "bootstrap":
+        asyncio.run(bootstrap(args.create_tables))
+    else:
+        openapi(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Bounded LRU mapping whose entries also expire after `ttl` seconds.
+    Not thread-safe; it is meant to be used from the event loop only.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def evict(self, predicate: Callable[[Any], bool]) -> int:
+        """
+        Drop every entry whose value matches `predicate`; O(size).
+        """
+        keys = [key for key, (_, value) in self._data.items() if predicate(value)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class PrincipalCache:
+    """
+    Maps a bearer token to a snapshot (column values) of the user it was
+    issued for, so `get_current_user` can skip the JWT decode and the user
+    lookup. Snapshots of a user must be dropped with `invalidate_user`
+    whenever that user row changes.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        return self._cache.get(token)
+
+    def set(self, token: str, snapshot: Dict[str, Any], expires_at: float) -> None:
+        """
+        Cache `snapshot` for `token` until the cache TTL or the token's own
+        expiry (a unix timestamp), whichever comes first.
+        """
+        self._cache.set(token, snapshot, ttl=expires_at - time.time())
+
+    def invalidate_user(self, user_id: int) -> None:
+        self._cache.evict(lambda snapshot: snapshot["id"] == user_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return self._cache.stats()
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+
+class MemoryCacheBackend:
+    """
+    Response cache storage local to the worker process.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._values = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._values.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._values.set(key, value, ttl=ttl)
+
+    async def generations(self, names: Sequence[str]) -> Sequence[int]:
+        return [self._generations.get(name, 0) for name in names]
+
+    async def bump(self, name: str) -> None:
+        self._generations[name] = self._generations.get(name, 0) + 1
+
+    def clear(self) -> None:
+        self._values.clear()
+        self._generations.clear()
+
+
+class RedisCacheBackend:
+    """
+    Response cache storage shared by every worker, on any client with the
+    `redis.asyncio` API (get, set with `ex`, mget, incr).
+    """
+
+    def __init__(self, client: Any, prefix: str = "response-cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(self.prefix + key, value, ex=max(1, math.ceil(ttl)))
+
+    async def generations(self, names: Sequence[str]) -> Sequence[int]:
+        values = await self.client.mget([f"{self.prefix}gen:{name}" for name in names])
+        return [int(value or 0) for value in values]
+
+    async def bump(self, name: str) -> None:
+        await self.client.incr(f"{self.prefix}gen:{name}")
+
+
+class ResponseCache:
+    """
+    Caches rendered responses under keys tagged with the generations of the
+    data they were built from. Writers `invalidate` a generation name (e.g.
+    "clients" or "clients:owner:3") after committing, which retires every key
+    built on it without having to find those keys.
+
+    Concurrent misses on the same key within a process are coalesced: the
+    first caller computes the value and the others await its result.
+    """
+
+    def __init__(self, backend: Any, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+        self._in_flight: Dict[str, "asyncio.Future[bytes]"] = {}
+
+    async def get_or_set(
+        self, key: str, generations: Sequence[str], compute: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        try:
+            numbers = await self.backend.generations(generations)
+            key = f"{key}|" + ",".join(f"{name}={n}" for name, n in zip(generations, numbers))
+            value = await self.backend.get(key)
+        except Exception:
+            logger.warning("Response cache lookup failed", exc_info=True)
+            self.errors += 1
+            return await compute()
+        if value is not None:
+            self.hits += 1
+            return value
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                if not in_flight.cancelled():
+                    raise
+                # The computing request went away; do the work ourselves.
+                return await compute()
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Retrieve it so an exception nobody waited for is not reported.
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            del self._in_flight[key]
+        try:
+            await self.backend.set(key, value, ttl=self.ttl)
+        except Exception:
+            logger.warning("Response cache store failed", exc_info=True)
+            self.errors += 1
+        return value
+
+    async def invalidate(self, *names: str) -> None:
+        for name in names:
+            try:
+                await self.backend.bump(name)
+            except Exception:
+                logger.warning("Response cache invalidation of %s failed", name, exc_info=True)
+                self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.RESPONSE_CACHE_ENABLED,
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+        }
+
+
+def _response_cache_backend() -> Any:
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        import redis.asyncio as redis
+
+        return RedisCacheBackend(redis.from_url(settings.RESPONSE_CACHE_REDIS_URL))
+    return MemoryCacheBackend(
+        maxsize=settings.RESPONSE_CACHE_MAX_SIZE, ttl=settings.RESPONSE_CACHE_TTL_SECONDS
+    )
+
+
+response_cache = ResponseCache(_response_cache_backend(), ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
@@ -0,0 +1,210 @@
+import bisect
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+slow_query_logger = logging.getLogger("app.db.slow_query")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+LAG_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+
+class RequestStats:
+    """
+    SQL work done on behalf of the current request.
+    """
+
+    __slots__ = ("scope", "statements", "db_seconds")
+
+    def __init__(self, scope: Dict[str, Any]) -> None:
+        self.scope = scope
+        self.statements = 0
+        self.db_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        """
+        Path template of the matched route, so ids do not create new series.
+        """
+        route = self.scope.get("route")
+        template = getattr(route, "path_format", None)
+        if template is None:
+            return "unmatched"
+        # Routes of included routers may only know the path below their
+        # prefix; recover the prefix from the concrete path.
+        path = self.scope["path"]
+        try:
+            concrete = template.format(**self.scope.get("path_params", {}))
+        except (KeyError, IndexError, ValueError):
+            return template
+        if concrete and path.endswith(concrete):
+            return path[: len(path) - len(concrete)] + template
+        return template
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    """
+    Prometheus-style cumulative histogram, one series per label values.
+    """
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> (per-bucket counts with a final +Inf slot, sum)
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        counts, total = self._series.setdefault(
+            label_values, ([0] * (len(self.buckets) + 1), [0.0])
+        )
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def clear(self) -> None:
+        self._series.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total) in sorted(self._series.items()):
+            labels = ",".join(
+                f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values)
+            )
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total[0]}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_LABELS = ("method", "route", "status")
+request_duration = Histogram(
+    "http_request_duration_seconds", "Time to serve the request.", REQUEST_LABELS, LATENCY_BUCKETS
+)
+request_db_duration = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent executing SQL for the request.",
+    REQUEST_LABELS,
+    LATENCY_BUCKETS,
+)
+request_statements = Histogram(
+    "http_request_db_statements",
+    "SQL statements executed for the request.",
+    REQUEST_LABELS,
+    STATEMENT_BUCKETS,
+)
+outbox_lag = Histogram(
+    "outbox_delivery_lag_seconds",
+    "Time from writing an outbox event to delivering it.",
+    ("topic",),
+    LAG_BUCKETS,
+)
+HISTOGRAMS = (request_duration, request_db_duration, request_statements, outbox_lag)
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
+
+
+def parameter_shape(parameters: Any) -> str:
+    """
+    Describe bound parameters by type only, e.g. "(int, str, NoneType)", so
+    they can be logged without exposing values.
+    """
+    if isinstance(parameters, dict):
+        types = (f"{key}: {type(value).__name__}" for key, value in parameters.items())
+        return "{" + ", ".join(types) + "}"
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    # On the execution context, which is dropped with a failing statement
+    context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - context._query_started
+    stats = request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS
+    if threshold and elapsed * 1000 >= threshold:
+        slow_query_logger.warning(
+            "Slow query (%.1f ms) on %s: %s; parameters %s",
+            elapsed * 1000,
+            stats.route if stats is not None else "-",
+            " ".join(statement.split()),
+            parameter_shape(parameters),
+        )
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Counts the statements and SQL time of each HTTP request, reports them in
+    a `Server-Timing` header and records per-route histograms.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = request_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.SERVER_TIMING_HEADER:
+                    total_ms = (time.perf_counter() - started) * 1000
+                    value = (
+                        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.statements} queries", '
+                        f"app;dur={total_ms:.1f}"
+                    )
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", value.encode())
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_stats.reset(token)
+            labels = (scope["method"], stats.route, str(status))
+            request_duration.observe(time.perf_counter() - started, *labels)
+            request_db_duration.observe(stats.db_seconds, *labels)
+            request_statements.observe(stats.statements, *labels)
@@ -0,0 +1,26 @@
+import base64
+import json
+from typing import Any, Dict
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """
+    Encode the keyset position of the last row of a page into an opaque cursor.
+    """
+    raw = json.dumps(values, separators=(",", ":"), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decode a cursor produced by `encode_cursor`, raising ValueError if it was
+    tampered with or is otherwise malformed.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, dict):
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,155 @@
+import logging
+import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+LIMIT = re.compile(r"^\s*(\d+)\s*/\s*(second|minute|hour|day)\s*$")
+
+
+@lru_cache(maxsize=None)
+def parse_limit(limit: str) -> Tuple[float, float]:
+    """
+    Token bucket of a limit like "10/minute": the refill rate in tokens per
+    second and the burst (bucket size), here the whole count.
+    """
+    match = LIMIT.match(limit)
+    if match is None:
+        raise ValueError(f"Invalid rate limit {limit!r}, expected e.g. '10/minute'")
+    count = int(match.group(1))
+    return count / PERIODS[match.group(2)], float(count)
+
+
+class MemoryRateLimitBackend:
+    """
+    Token buckets local to the worker process: two floats per key, with the
+    least recently used keys dropped past `maxsize`. Not thread-safe; it is
+    meant to be used from the event loop only.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        """
+        Take `cost` tokens from the bucket of `key`. Returns 0 if they were
+        available, or else the seconds until they will be.
+        """
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated_at) * rate)
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+# Same algorithm as MemoryRateLimitBackend.take, run atomically in Redis on
+# its clock. Idle buckets expire once they would be full again.
+TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or burst
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + (now - updated_at) * rate)
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RedisRateLimitBackend:
+    """
+    Token buckets shared by every worker, on any client with the
+    `redis.asyncio` API (eval).
+    """
+
+    def __init__(self, client: Any, prefix: str = "rate-limit:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        wait = await self.client.eval(TAKE_SCRIPT, 1, self.prefix + key, rate, burst, cost)
+        return float(wait)
+
+
+class RateLimiter:
+    """
+    Applies the limits of RATE_LIMITS, by name, to keys such as a client IP.
+    When the backend fails, requests are let through.
+    """
+
+    def __init__(self, backend: Any):
+        self.backend = backend
+        self.allowed = 0
+        self.rejected = 0
+        self.errors = 0
+
+    async def hit(self, name: str, key: str) -> float:
+        """
+        Count a request of `key` against limit `name`. Returns 0 if it is
+        allowed, or else the seconds after which to retry.
+        """
+        limit = settings.RATE_LIMITS.get(name)
+        if not settings.RATE_LIMIT_ENABLED or not limit:
+            return 0.0
+        rate, burst = parse_limit(limit)
+        try:
+            wait = await self.backend.take(f"{name}:{key}", rate, burst)
+        except Exception:
+            logger.warning("Rate limit check of %s failed", name, exc_info=True)
+            self.errors += 1
+            return 0.0
+        if wait > 0:
+            self.rejected += 1
+        else:
+            self.allowed += 1
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.RATE_LIMIT_ENABLED,
+            "backend": type(self.backend).__name__,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "errors": self.errors,
+        }
+
+
+def _rate_limit_backend() -> Any:
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        import redis.asyncio as redis
+
+        return RedisRateLimitBackend(redis.from_url(settings.RATE_LIMIT_REDIS_URL))
+    return MemoryRateLimitBackend(maxsize=settings.RATE_LIMIT_MAX_KEYS)
+
+
+rate_limiter = RateLimiter(_rate_limit_backend())
@@ -1,5 +1,8 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar, Union
 
 from jose import jwt
 from passlib.context import CryptContext
@@ -8,17 +11,24 @@ from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+T = TypeVar("T")
+
 
 def create_access_token(
-    subject: Union[str, Any], expires_delta: timedelta = None
+    subject: Union[str, Any],
+    expires_delta: timedelta = None,
+    claims: Optional[Dict[str, Any]] = None,
 ) -> str:
+    """
+    Signed token for `subject`, carrying the extra `claims` if given.
+    """
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {**(claims or {}), "exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
     return encoded_jwt
 
@@ -28,4 +38,142 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+
+class PasswordHasherPool:
+    """
+    Runs password hashing off the event loop on a bounded thread or process
+    pool. The pool size is the concurrency cap; calls beyond it wait in the
+    executor queue and are reported as `queued`.
+    """
+
+    def __init__(self, mode: str = "thread", max_workers: int = 4):
+        self.mode = mode
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+        self.in_flight = 0
+        self.max_queued = 0
+        self.completed = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.in_flight - self.max_workers)
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        if self.mode == "inline":
+            self.completed += 1
+            return func(*args)
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        try:
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_pool = PasswordHasherPool(
+    mode=settings.PASSWORD_HASH_EXECUTOR, max_workers=settings.PASSWORD_HASH_WORKERS
+)
+
+
+class TokenRevocations:
+    """
+    Lowest valid token version of the users whose tokens were revoked, so
+    token claims can be trusted without reading the user row. The set is
+    reloaded at most every `refresh_seconds`; until then, revocations made by
+    other workers are not seen.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.refreshes = 0
+        self._versions: Dict[int, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._loading: Optional["asyncio.Future[None]"] = None
+
+    @property
+    def stale(self) -> bool:
+        return (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at >= self.refresh_seconds
+        )
+
+    def is_revoked(self, user_id: int, version: int) -> bool:
+        return version < self._versions.get(user_id, 0)
+
+    def revoke(self, user_id: int, version: int) -> None:
+        """
+        Revoke the tokens of `user_id` older than `version` in this worker
+        right away, ahead of the next reload.
+        """
+        self._versions[user_id] = max(version, self._versions.get(user_id, 0))
+
+    async def refresh(self, load: Callable[[], Awaitable[Dict[int, int]]]) -> None:
+        """
+        Replace the set with the result of `load`. Concurrent callers share
+        one load; once a set has been loaded they keep using it meanwhile.
+        """
+        if self._loading is not None:
+            if self._loaded_at is None:
+                await asyncio.shield(self._loading)
+            return
+        loading = self._loading = asyncio.get_running_loop().create_future()
+        try:
+            self._versions = dict(await load())
+            self._loaded_at = time.monotonic()
+            self.refreshes += 1
+        except BaseException as exc:
+            loading.set_exception(exc)
+            # Retrieve it so an exception nobody waited for is not reported.
+            loading.exception()
+            raise
+        else:
+            loading.set_result(None)
+        finally:
+            self._loading = None
+
+    def clear(self) -> None:
+        self._versions.clear()
+        self._loaded_at = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._versions), "refreshes": self.refreshes}
+
+
+token_revocations = TokenRevocations(refresh_seconds=settings.TOKEN_REVOCATION_REFRESH_SECONDS)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_pool.run(get_password_hash, password)
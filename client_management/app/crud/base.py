@@ -1,10 +1,13 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy import select, update, delete
+from sqlalchemy import ARRAY, Integer, any_, bindparam, delete, insert, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement, Insert, Select
 
+from app.core.pagination import decode_cursor, encode_cursor
 from app.db.base import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -12,7 +15,20 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
+def dialect_insert(db: AsyncSession, model: Type[Base]) -> Insert:
+    """
+    INSERT construct of the session's dialect, which supports ON CONFLICT.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    # Fields whose value before an update is read, under a row lock, and
+    # passed to `_updated` when the update sets them
+    tracked_fields: Tuple[str, ...] = ()
+
     def __init__(self, model: Type[ModelType]):
         """
         CRUD object with default methods to Create, Read, Update, Delete (CRUD).
@@ -22,50 +38,180 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         self.model = model
 
+    def _visible(self) -> List[ColumnElement[bool]]:
+        """
+        Conditions a row must meet to be read or updated, e.g. not being
+        soft-deleted.
+        """
+        return []
+
+    def _select(self) -> Select:
+        return select(self.model).where(*self._visible())
+
     async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
-        query = select(self.model).where(self.model.id == id)
+        query = self._select().where(self.model.id == id)
         result = await db.execute(query)
         return result.scalars().first()
 
+    def _id_in(self, db: AsyncSession, ids: Sequence[int]) -> ColumnElement[bool]:
+        if db.get_bind().dialect.name == "postgresql":
+            # One array parameter instead of one per id keeps the statement
+            # text, and so its cached prepared statement, the same for any count.
+            return self.model.id == any_(bindparam("ids", list(ids), type_=ARRAY(Integer)))
+        return self.model.id.in_(ids)
+
+    async def get_many(self, db: AsyncSession, ids: Sequence[int]) -> List[ModelType]:
+        """
+        Rows with the given ids in one query, in the order of `ids`; missing
+        ids are skipped and duplicates returned once.
+        """
+        return await self._get_many(db, self._select(), ids)
+
+    async def _get_many(
+        self, db: AsyncSession, query: Select, ids: Sequence[int]
+    ) -> List[ModelType]:
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return []
+        result = await db.execute(query.where(self._id_in(db, ids)))
+        rows = {row.id: row for row in result.scalars()}
+        return [rows[id] for id in ids if id in rows]
+
     async def get_multi(
         self, db: AsyncSession, *, skip: int = 0, limit: int = 100
     ) -> List[ModelType]:
-        query = select(self.model).offset(skip).limit(limit)
+        query = self._select().order_by(self.model.id).offset(skip).limit(limit)
         result = await db.execute(query)
         return result.scalars().all()
 
+    async def get_page(
+        self, db: AsyncSession, *, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        return await self._paginate(db, self._select(), cursor=cursor, limit=limit)
+
+    async def _paginate(
+        self, db: AsyncSession, query: Select, *, cursor: Optional[str], limit: int
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Keyset pagination on the primary key: seeks past the last id of the
+        previous page instead of skipping rows, so every page costs the same.
+        One extra row is fetched to know whether a next page exists.
+        """
+        if cursor:
+            last_id = decode_cursor(cursor).get("id")
+            if not isinstance(last_id, int):
+                raise ValueError("Invalid cursor")
+            query = query.where(self.model.id > last_id)
+        query = query.order_by(self.model.id).limit(limit + 1)
+        result = await db.execute(query)
+        items = result.scalars().all()
+        next_cursor = None
+        if limit > 0 and len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor({"id": items[-1].id})
+        return items, next_cursor
+
     async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType, created_by: int = None) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
         if created_by:
             obj_in_data["created_by"] = created_by
-        db_obj = self.model(**obj_in_data)
-        db.add(db_obj)
+        return await self._insert(db, obj_in_data)
+
+    async def _insert(self, db: AsyncSession, values: Dict[str, Any]) -> ModelType:
+        query = insert(self.model).values(**values).returning(self.model)
+        result = await db.execute(query)
+        db_obj = result.scalars().one()
+        await self._counted(db, [db_obj], 1)
         await db.commit()
-        await db.refresh(db_obj)
+        await self._written(db_obj)
         return db_obj
 
+    async def _counted(self, db: AsyncSession, db_objs: Sequence[ModelType], sign: int) -> None:
+        """
+        Called before committing the insert (`sign` 1) or delete (-1) of
+        `db_objs`, to maintain aggregates and dependent rows in the same
+        transaction.
+        """
+
+    async def _updated(
+        self, db: AsyncSession, db_obj: ModelType, values: Dict[str, Any], previous: Dict[str, Any]
+    ) -> None:
+        """
+        Called before committing the update of `db_obj` with `values`, to
+        maintain dependent rows in the same transaction. `previous` holds the
+        former value of the `tracked_fields` in `values`.
+        """
+
+    async def _written(self, db_obj: ModelType) -> None:
+        """
+        Called after a commit that created, updated or deleted `db_obj`, to
+        invalidate whatever was derived from it.
+        """
+
     async def update(
         self,
         db: AsyncSession,
         *,
         db_obj: ModelType,
-        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
-    ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        version: Optional[int] = None,
+    ) -> Optional[ModelType]:
+        """
+        Update `db_obj` and bump its version. Given `version`, the update only
+        applies while the row is still at that version, and None is returned
+        when it is not.
+        """
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
-        db.add(db_obj)
+        columns = inspect(self.model).column_attrs.keys()
+        values = {
+            field: value
+            for field, value in update_data.items()
+            if field in columns and field != "version"
+        }
+        if not values:
+            return db_obj if version is None or db_obj.version == version else None
+        previous: Dict[str, Any] = {}
+        tracked = [field for field in self.tracked_fields if field in values]
+        if tracked:
+            locked = await db.execute(
+                select(*(getattr(self.model, field) for field in tracked))
+                .where(self.model.id == db_obj.id)
+                .with_for_update()
+            )
+            row = locked.one_or_none()
+            if row is not None:
+                previous = dict(zip(tracked, row))
+        query = (
+            update(self.model)
+            .where(self.model.id == db_obj.id, *self._visible())
+            .values(**values, version=self.model.version + 1)
+            .returning(self.model)
+        )
+        if version is not None:
+            query = query.where(self.model.version == version)
+        result = await db.execute(query)
+        db_obj = result.scalars().one_or_none()
+        if db_obj is not None:
+            await self._updated(db, db_obj, values, previous)
         await db.commit()
-        await db.refresh(db_obj)
+        if db_obj is not None:
+            await self._written(db_obj)
         return db_obj
 
-    async def remove(self, db: AsyncSession, *, id: int) -> ModelType:
-        obj = await self.get(db=db, id=id)
-        await db.delete(obj)
+    async def remove(self, db: AsyncSession, *, id: int) -> Optional[ModelType]:
+        query = (
+            delete(self.model)
+            .where(self.model.id == id, *self._visible())
+            .returning(self.model)
+        )
+        result = await db.execute(query)
+        obj = result.scalars().first()
+        if obj is not None:
+            await self._counted(db, [obj], -1)
         await db.commit()
-        return obj
\ No newline at end of file
+        if obj is not None:
+            await self._written(obj)
+        return obj
@@ -1,25 +1,665 @@
-from typing import List, Optional
+import re
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Date,
+    and_,
+    case,
+    cast,
+    delete,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    text,
+    tuple_,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import ColumnElement
 
-from app.crud.base import CRUDBase
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.crud.base import CRUDBase, dialect_insert
 from app.models.client import Client
-from app.schemas.client import ClientCreate, ClientUpdate
+from app.models.client_count import ClientCount
+from app.models.client_daily_count import ClientDailyCount
+from app.models.outbox_event import OutboxEvent
+from app.models.user import User
+from app.schemas.client import ClientBulkFilter, ClientCreate, ClientUpdate
+
+# Generated tsvector column of name, email, phone and notes, GIN-indexed by
+# migration d628bf273637. It is not mapped on the model because it only
+# exists on PostgreSQL.
+SEARCH_VECTOR = literal_column("clients.search_vector")
+SEARCH_TERM = re.compile(r"[^\s'\\]+")
+# Shorter terms are ignored: as prefixes they match most of the table.
+SEARCH_MIN_TERM_LENGTH = 3
+# Matches ranked per search on PostgreSQL; bounds the cost of broad terms.
+SEARCH_CANDIDATES = 1000
+# (owner, is_active, created_at) of a client, as the aggregates see it
+CountedClient = Tuple[Optional[int], Optional[bool], Optional[datetime]]
+
+
+def _utc_day(value: datetime) -> date:
+    # SQLite returns naive datetimes; they are UTC.
+    return (value.astimezone(timezone.utc) if value.tzinfo is not None else value).date()
 
 
 class CRUDClient(CRUDBase[Client, ClientCreate, ClientUpdate]):
+    tracked_fields = ("is_active",)
+
+    def cache_generation(self, user: User) -> str:
+        """
+        Response cache generation of the clients `user` can list: all of them
+        for a superuser, their own otherwise.
+        """
+        return "clients" if user.is_superuser else f"clients:owner:{user.id}"
+
+    async def _invalidate_owner(self, *owner_ids: Optional[int]) -> None:
+        await response_cache.invalidate(
+            "clients", *(f"clients:owner:{owner_id}" for owner_id in owner_ids)
+        )
+
+    async def _written(self, db_obj: Client) -> None:
+        await self._invalidate_owner(db_obj.created_by)
+
+    def _visible(self) -> List[ColumnElement[bool]]:
+        return [Client.deleted_at.is_(None)]
+
+    async def _counted(self, db: AsyncSession, db_objs: Sequence[Client], sign: int) -> None:
+        await self._adjust_counts(
+            db, [(c.created_by, c.is_active, c.created_at) for c in db_objs], sign
+        )
+        await self._emit(
+            db,
+            "client.created" if sign > 0 else "client.deleted",
+            [(c.id, c.created_by) for c in db_objs],
+        )
+
+    async def _updated(
+        self, db: AsyncSession, db_obj: Client, values: Dict[str, Any], previous: Dict[str, Any]
+    ) -> None:
+        if "is_active" in previous and bool(previous["is_active"]) != bool(db_obj.is_active):
+            await self._add_counts(db, {db_obj.created_by: (0, 1 if db_obj.is_active else -1)})
+        await self._emit(
+            db, "client.updated", [(db_obj.id, db_obj.created_by)], fields=sorted(values)
+        )
+
+    async def _emit(
+        self,
+        db: AsyncSession,
+        topic: str,
+        clients: Iterable[Tuple[int, Optional[int]]],
+        **extra: Any,
+    ) -> None:
+        """
+        Record a `topic` event per (id, owner) of `clients` in the outbox, in
+        the current transaction, for app.jobs.outbox to deliver.
+        """
+        rows = [
+            {"topic": topic, "payload": {"id": id, "created_by": owner, **extra}}
+            for id, owner in clients
+        ]
+        if rows:
+            await db.execute(insert(OutboxEvent), rows)
+
+    async def _adjust_counts(
+        self, db: AsyncSession, clients: Sequence[CountedClient], sign: int
+    ) -> None:
+        """
+        Count `clients` in (`sign` 1) or out of (-1) the per-owner aggregates,
+        in the current transaction.
+        """
+        deltas: Dict[Optional[int], Tuple[int, int]] = {}
+        days: Counter = Counter()
+        for owner, is_active, created_at in clients:
+            count, active = deltas.get(owner, (0, 0))
+            deltas[owner] = (count + sign, active + sign if is_active else active)
+            if owner is not None and created_at is not None:
+                days[owner, _utc_day(created_at)] += sign
+        await self._add_counts(db, deltas)
+        rows = [
+            {"owner_id": owner, "day": day, "created": delta}
+            for (owner, day), delta in sorted(days.items())
+            if delta
+        ]
+        if rows:
+            query = dialect_insert(db, ClientDailyCount.__table__)
+            query = query.on_conflict_do_update(
+                index_elements=[ClientDailyCount.owner_id, ClientDailyCount.day],
+                set_={"created": ClientDailyCount.created + query.excluded.created},
+            )
+            await db.execute(query, rows)
+
+    async def _add_counts(
+        self, db: AsyncSession, deltas: Dict[Optional[int], Tuple[int, int]]
+    ) -> None:
+        """
+        Add (count, active) `deltas` to the per-owner client counts in the
+        current transaction.
+        """
+        # Sorted, so concurrent writers lock the rows in the same order
+        rows = [
+            {"owner_id": owner, "count": count, "active": active}
+            for owner, (count, active) in sorted(deltas.items(), key=lambda item: item[0] or 0)
+            if owner is not None and (count or active)
+        ]
+        if not rows:
+            return
+        query = dialect_insert(db, ClientCount.__table__)
+        query = query.on_conflict_do_update(
+            index_elements=[ClientCount.owner_id],
+            set_={
+                "count": ClientCount.count + query.excluded["count"],
+                "active": ClientCount.active + query.excluded.active,
+            },
+        )
+        await db.execute(query, rows)
+
+    async def count_estimate(self, db: AsyncSession, *, owner_id: Optional[int] = None) -> int:
+        """
+        Approximate number of clients, without counting rows: the maintained
+        counter of `owner_id`, or for all clients the planner's row estimate
+        on PostgreSQL (kept current by autovacuum) and the sum of the counters
+        elsewhere.
+        """
+        if owner_id is not None:
+            query = select(ClientCount.count).where(ClientCount.owner_id == owner_id)
+            return (await db.execute(query)).scalar() or 0
+        if db.get_bind().dialect.name == "postgresql":
+            # The partial index on deleted_at holds exactly the tombstones.
+            query = text(
+                "SELECT (SELECT reltuples FROM pg_class WHERE oid = 'clients'::regclass),"
+                " (SELECT reltuples FROM pg_class WHERE oid = 'ix_clients_deleted_at'::regclass)"
+            )
+            rows, deleted = (await db.execute(query)).one()
+            # -1 until the table is first vacuumed or analyzed
+            if rows >= 0:
+                return max(0, int(rows - max(deleted, 0)))
+        query = select(func.coalesce(func.sum(ClientCount.count), 0))
+        return (await db.execute(query)).scalar()
+
+    async def count(
+        self, db: AsyncSession, *, owner_id: Optional[int] = None, cap: int = 10000
+    ) -> int:
+        """
+        Exact number of clients of `owner_id`, or of all clients, reading at
+        most `cap` + 1 rows: a result over `cap` only means "more than cap".
+        """
+        rows = self._select().with_only_columns(Client.id)
+        if owner_id is not None:
+            rows = rows.where(Client.created_by == owner_id)
+        query = select(func.count()).select_from(rows.limit(cap + 1).subquery())
+        return (await db.execute(query)).scalar()
+
+    async def stats(self, db: AsyncSession, *, owner_id: Optional[int] = None) -> Dict[str, int]:
+        """
+        Client totals of `owner_id`, or of all owners, read from the
+        maintained aggregates: live clients, active and inactive ones, and
+        those created this (UTC) week, from Monday, and month.
+        """
+        today = datetime.now(timezone.utc).date()
+        week = today - timedelta(days=today.weekday())
+        month = today.replace(day=1)
+        counts = select(
+            func.coalesce(func.sum(ClientCount.count), 0),
+            func.coalesce(func.sum(ClientCount.active), 0),
+        )
+        created, day = ClientDailyCount.created, ClientDailyCount.day
+        daily = select(
+            func.coalesce(func.sum(created).filter(day >= week), 0),
+            func.coalesce(func.sum(created).filter(day >= month), 0),
+        ).where(day >= min(week, month))
+        if owner_id is not None:
+            counts = counts.where(ClientCount.owner_id == owner_id)
+            daily = daily.where(ClientDailyCount.owner_id == owner_id)
+        total, active = (await db.execute(counts)).one()
+        new_this_week, new_this_month = (await db.execute(daily)).one()
+        return {
+            "total": total,
+            "active": active,
+            "inactive": total - active,
+            "new_this_week": new_this_week,
+            "new_this_month": new_this_month,
+        }
+
+    async def rebuild_stats(self, db: AsyncSession, *, batch_size: int = 1000) -> int:
+        """
+        Recompute the per-owner aggregates from the clients table, `batch_size`
+        owners per transaction, repairing any drift. Returns the number of
+        owners rebuilt.
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            created_day = cast(func.timezone("UTC", Client.created_at), Date)
+        else:
+            created_day = func.date(Client.created_at)
+        rebuilt = 0
+        last_id = 0
+        while True:
+            result = await db.execute(
+                select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size)
+            )
+            owners = result.scalars().all()
+            if not owners:
+                return rebuilt
+            # Writers update the counts before the daily rows: with the counts
+            # locked, a writer either committed before the recount or waits
+            # and applies its change on top of it. Missing counts are created
+            # first, as FOR UPDATE can't lock rows that don't exist yet.
+            await db.execute(
+                dialect_insert(db, ClientCount.__table__).on_conflict_do_nothing(),
+                [{"owner_id": owner, "count": 0, "active": 0} for owner in owners],
+            )
+            await db.execute(
+                select(ClientCount.owner_id)
+                .where(ClientCount.owner_id.in_(owners))
+                .with_for_update()
+            )
+            live = and_(Client.created_by.in_(owners), *self._visible())
+            result = await db.execute(
+                select(
+                    Client.created_by,
+                    func.count(),
+                    func.count().filter(Client.is_active.is_(True)),
+                )
+                .where(live)
+                .group_by(Client.created_by)
+            )
+            counts = {owner: (count, active) for owner, count, active in result.all()}
+            rows = []
+            for owner in owners:
+                count, active = counts.get(owner, (0, 0))
+                rows.append({"owner_id": owner, "count": count, "active": active})
+            query = dialect_insert(db, ClientCount.__table__)
+            query = query.on_conflict_do_update(
+                index_elements=[ClientCount.owner_id],
+                set_={"count": query.excluded["count"], "active": query.excluded.active},
+            )
+            await db.execute(query, rows)
+            await db.execute(
+                delete(ClientDailyCount).where(ClientDailyCount.owner_id.in_(owners))
+            )
+            await db.execute(
+                insert(ClientDailyCount).from_select(
+                    ["owner_id", "day", "created"],
+                    select(Client.created_by, created_day, func.count())
+                    .where(live)
+                    .group_by(Client.created_by, created_day),
+                )
+            )
+            await db.commit()
+            rebuilt += len(owners)
+            last_id = owners[-1]
+
+    async def remove(self, db: AsyncSession, *, id: int) -> Optional[Client]:
+        """
+        Soft-delete the client, or delete it outright unless CLIENT_SOFT_DELETE
+        is set. Soft-deleted clients are hidden from every other method and
+        purged later by `app.jobs.purge`.
+        """
+        if not settings.CLIENT_SOFT_DELETE:
+            return await super().remove(db, id=id)
+        query = (
+            update(Client)
+            .where(Client.id == id, *self._visible())
+            .values(deleted_at=func.now(), version=Client.version + 1)
+            .returning(Client)
+        )
+        result = await db.execute(query)
+        obj = result.scalars().first()
+        if obj is not None:
+            await self._counted(db, [obj], -1)
+        await db.commit()
+        if obj is not None:
+            await self._written(obj)
+        return obj
+
     async def get_by_email(self, db: AsyncSession, *, email: str) -> Optional[Client]:
-        query = select(Client).where(Client.email == email)
+        query = self._select().where(Client.email == email)
         result = await db.execute(query)
         return result.scalars().first()
     
     async def get_multi_by_owner(
         self, db: AsyncSession, *, owner_id: int, skip: int = 0, limit: int = 100
     ) -> List[Client]:
-        query = select(Client).where(Client.created_by == owner_id).offset(skip).limit(limit)
+        query = (
+            self._select()
+            .where(Client.created_by == owner_id)
+            .order_by(Client.id)
+            .offset(skip)
+            .limit(limit)
+        )
         result = await db.execute(query)
         return result.scalars().all()
 
+    async def get_many(
+        self, db: AsyncSession, ids: Sequence[int], *, owner_id: Optional[int] = None
+    ) -> List[Client]:
+        query = self._select()
+        if owner_id is not None:
+            query = query.where(Client.created_by == owner_id)
+        return await self._get_many(db, query, ids)
+
+    async def get_page_by_owner(
+        self, db: AsyncSession, *, owner_id: int, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[Client], Optional[str]]:
+        query = self._select().where(Client.created_by == owner_id)
+        return await self._paginate(db, query, cursor=cursor, limit=limit)
+
+    async def search(
+        self, db: AsyncSession, *, q: str, owner_id: Optional[int] = None, limit: int = 20
+    ) -> List[Client]:
+        """
+        Clients whose name, email, phone or notes contain a word starting with
+        every term of `q`, best matches first. Terms shorter than
+        SEARCH_MIN_TERM_LENGTH are ignored. Uses the full-text index on
+        PostgreSQL, where only the first SEARCH_CANDIDATES matches are ranked
+        (so the order is approximate for broader terms), and falls back to
+        LIKE scans elsewhere.
+        """
+        terms = [term for term in SEARCH_TERM.findall(q) if len(term) >= SEARCH_MIN_TERM_LENGTH]
+        if not terms:
+            return []
+        if db.get_bind().dialect.name == "postgresql":
+            tsquery = func.to_tsquery(
+                literal_column("'simple'"), " & ".join(f"'{term}':*" for term in terms)
+            )
+            candidates = select(Client, SEARCH_VECTOR.label("search_vector")).where(
+                SEARCH_VECTOR.op("@@")(tsquery), *self._visible()
+            )
+            if owner_id is not None:
+                candidates = candidates.where(Client.created_by == owner_id)
+            candidates = candidates.limit(SEARCH_CANDIDATES).subquery()
+            match = aliased(Client, candidates)
+            rank = func.ts_rank(candidates.c.search_vector, tsquery)
+            query = select(match).order_by(rank.desc(), match.id)
+        else:
+            columns = (Client.name, Client.email, Client.phone, Client.notes)
+            patterns = [
+                "%" + term.replace("%", "\\%").replace("_", "\\_") + "%" for term in terms
+            ]
+            matches = [
+                or_(*(column.ilike(pattern, escape="\\") for column in columns))
+                for pattern in patterns
+            ]
+            name_first = case((Client.name.ilike(patterns[0], escape="\\"), 0), else_=1)
+            query = self._select().where(*matches).order_by(name_first, Client.id)
+            if owner_id is not None:
+                query = query.where(Client.created_by == owner_id)
+        result = await db.execute(query.limit(limit))
+        return result.scalars().all()
+
+    async def stream(
+        self, db: AsyncSession, *, owner_id: Optional[int] = None, batch_size: int = 1000
+    ) -> AsyncIterator[Client]:
+        """
+        Iterate over clients in id order from a server-side cursor, holding at
+        most `batch_size` rows in memory.
+        """
+        query = self._select().order_by(Client.id).execution_options(yield_per=batch_size)
+        if owner_id is not None:
+            query = query.where(Client.created_by == owner_id)
+        result = await db.stream_scalars(query)
+        async for client in result:
+            yield client
+
+    async def create_many(
+        self, db: AsyncSession, *, objs_in: Sequence[ClientCreate], created_by: int
+    ) -> List[Optional[int]]:
+        """
+        Insert `objs_in` with multi-row INSERT ... ON CONFLICT (email) DO NOTHING
+        statements and commit. Returns the new id of every input, or None where
+        the email already exists in the table or earlier in the batch.
+        """
+        if not objs_in:
+            return []
+        rows = [dict(obj_in.model_dump(), created_by=created_by) for obj_in in objs_in]
+        unique_rows = {}
+        for row in rows:
+            unique_rows.setdefault(row["email"], row)
+        # Executed with a parameter list, the statement is compiled once and
+        # sent as batched multi-row VALUES ("insertmanyvalues").
+        query = (
+            dialect_insert(db, Client.__table__)
+            .on_conflict_do_nothing(
+                index_elements=[Client.email], index_where=Client.deleted_at.is_(None)
+            )
+            .returning(Client.id, Client.email, Client.is_active, Client.created_at)
+        )
+        result = await db.execute(query, list(unique_rows.values()))
+        rows_created = result.all()
+        created = {email: id for id, email, _, _ in rows_created}
+        await self._adjust_counts(
+            db,
+            [(created_by, is_active, created_at) for _, _, is_active, created_at in rows_created],
+            1,
+        )
+        await self._emit(db, "client.created", [(id, created_by) for id in created.values()])
+        await db.commit()
+        if created:
+            await self._invalidate_owner(created_by)
+        return [created.pop(row["email"], None) for row in rows]
+
+    def _bulk_conditions(
+        self, filter: Optional[ClientBulkFilter], owner_id: Optional[int]
+    ) -> ColumnElement[bool]:
+        conditions = self._visible()
+        if owner_id is not None:
+            conditions.append(Client.created_by == owner_id)
+        if filter is not None:
+            if filter.is_active is not None:
+                conditions.append(Client.is_active == filter.is_active)
+            if filter.created_by is not None:
+                conditions.append(Client.created_by == filter.created_by)
+            if filter.created_after is not None:
+                conditions.append(Client.created_at >= filter.created_after)
+            if filter.created_before is not None:
+                conditions.append(Client.created_at < filter.created_before)
+        return and_(*conditions)
+
+    async def _write_in_chunks(
+        self,
+        db: AsyncSession,
+        statement: Callable[[ColumnElement[bool]], Any],
+        *,
+        ids: Optional[Sequence[int]],
+        filter: Optional[ClientBulkFilter],
+        owner_id: Optional[int],
+        chunk_size: int,
+        removes: bool = False,
+        fields: Sequence[str] = (),
+        activates: Optional[bool] = None,
+    ) -> Tuple[int, int]:
+        """
+        Run the UPDATE or DELETE built by `statement` over the selected clients
+        in chunks of `chunk_size` rows, walking ids in order and committing
+        after each chunk so row locks are only held briefly. A `chunk_size` of
+        0 writes everything in one statement and transaction. `removes` tells
+        that the written clients are deleted, otherwise `fields` were updated,
+        and `activates` tells the is_active state set, if any. Returns the
+        number of rows written and of chunks.
+        """
+        selected = self._bulk_conditions(filter, owner_id)
+        affected = chunks = 0
+        owners = set()
+
+        async def write(condition: ColumnElement[bool]) -> List[int]:
+            nonlocal affected, chunks
+            if activates is not None:
+                # The UPDATE only returns new values: read which clients it
+                # flips first, locking them until it runs.
+                locked = await db.execute(
+                    select(Client.created_by, Client.is_active).where(condition).with_for_update()
+                )
+                flipped = Counter(
+                    owner for owner, is_active in locked.all() if bool(is_active) != activates
+                )
+                sign = 1 if activates else -1
+                await self._add_counts(db, {owner: (0, sign * n) for owner, n in flipped.items()})
+            query = statement(condition).returning(
+                Client.id, Client.created_by, Client.is_active, Client.created_at
+            )
+            # Rows loaded in the session are not kept in sync with the write.
+            result = await db.execute(query.execution_options(synchronize_session=False))
+            rows = result.all()
+            written = [(id, owner) for id, owner, _, _ in rows]
+            if removes:
+                removed = [(owner, active, created_at) for _, owner, active, created_at in rows]
+                await self._adjust_counts(db, removed, -1)
+                await self._emit(db, "client.deleted", written)
+            else:
+                await self._emit(db, "client.updated", written, fields=sorted(fields))
+            await db.commit()
+            chunks += 1
+            affected += len(rows)
+            owners.update(owner for _, owner in written)
+            return [id for id, _ in written]
+
+        if ids is not None:
+            ids = sorted(set(ids))
+            size = chunk_size if chunk_size > 0 else len(ids)
+            for start in range(0, len(ids), size):
+                await write(and_(selected, self._id_in(db, ids[start:start + size])))
+        elif chunk_size <= 0:
+            await write(selected)
+        else:
+            last_id = 0
+            while True:
+                chunk = (
+                    select(Client.id)
+                    .where(selected, Client.id > last_id)
+                    .order_by(Client.id)
+                    .limit(chunk_size)
+                )
+                written = await write(Client.id.in_(chunk))
+                if not written:
+                    break
+                last_id = max(written)
+        if owners:
+            await self._invalidate_owner(*owners)
+        return affected, chunks
+
+    async def update_many(
+        self,
+        db: AsyncSession,
+        *,
+        changes: Dict[str, Any],
+        ids: Optional[Sequence[int]] = None,
+        filter: Optional[ClientBulkFilter] = None,
+        owner_id: Optional[int] = None,
+        chunk_size: int = 1000,
+    ) -> Tuple[int, int]:
+        """
+        Apply `changes` to the clients with `ids` or matching `filter`, limited
+        to `owner_id`'s when given, with set-based UPDATEs.
+        """
+        return await self._write_in_chunks(
+            db,
+            lambda condition: update(Client)
+            .where(condition)
+            .values(**changes, version=Client.version + 1),
+            ids=ids,
+            filter=filter,
+            owner_id=owner_id,
+            chunk_size=chunk_size,
+            fields=list(changes),
+            activates=bool(changes["is_active"]) if "is_active" in changes else None,
+        )
+
+    async def remove_many(
+        self,
+        db: AsyncSession,
+        *,
+        ids: Optional[Sequence[int]] = None,
+        filter: Optional[ClientBulkFilter] = None,
+        owner_id: Optional[int] = None,
+        chunk_size: int = 1000,
+    ) -> Tuple[int, int]:
+        """
+        Delete the clients with `ids` or matching `filter`, limited to
+        `owner_id`'s when given, with set-based UPDATEs (soft delete) or
+        DELETEs.
+        """
+        if settings.CLIENT_SOFT_DELETE:
+            def statement(condition: ColumnElement[bool]) -> Any:
+                return (
+                    update(Client)
+                    .where(condition)
+                    .values(deleted_at=func.now(), version=Client.version + 1)
+                )
+        else:
+            def statement(condition: ColumnElement[bool]) -> Any:
+                return delete(Client).where(condition)
+        return await self._write_in_chunks(
+            db,
+            statement,
+            ids=ids,
+            filter=filter,
+            owner_id=owner_id,
+            chunk_size=chunk_size,
+            removes=True,
+        )
+
+    async def changes(
+        self,
+        db: AsyncSession,
+        *,
+        owner_id: Optional[int] = None,
+        after: Tuple[int, int] = (0, 0),
+        limit: int = 100,
+    ) -> List[Client]:
+        """
+        Clients of `owner_id`, or of everyone, written after the (change_seq,
+        id) position `after`, soft-deleted ones included, in change order.
+        Fetches `limit` + 1 rows to tell whether more follow.
+
+        On PostgreSQL, change_seq is the writing transaction's id, and ids are
+        not committed in order: only rows of transactions older than the
+        oldest one still running are returned, so a reader never moves past a
+        write it has not seen yet.
+        """
+        query = select(Client).where(tuple_(Client.change_seq, Client.id) > tuple_(*after))
+        if owner_id is not None:
+            query = query.where(Client.created_by == owner_id)
+        if db.get_bind().dialect.name == "postgresql":
+            query = query.where(
+                Client.change_seq
+                < literal_column("pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+            )
+        query = query.order_by(Client.change_seq, Client.id).limit(limit + 1)
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    async def purge(
+        self, db: AsyncSession, *, deleted_before: datetime, batch_size: int = 1000
+    ) -> int:
+        """
+        Permanently delete clients soft-deleted before `deleted_before`,
+        `batch_size` rows per statement and transaction. Returns the number of
+        rows deleted.
+        """
+        purged = 0
+        while True:
+            batch = (
+                select(Client.id)
+                .where(Client.deleted_at < deleted_before)
+                .order_by(Client.id)
+                .limit(batch_size)
+            )
+            result = await db.execute(
+                delete(Client)
+                .where(Client.id.in_(batch))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            purged += result.rowcount
+            if result.rowcount < batch_size:
+                return purged
+
 
-client = CRUDClient(Client)
\ No newline at end of file
+client = CRUDClient(Client)
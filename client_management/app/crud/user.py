@@ -1,14 +1,29 @@
-from typing import Any, Dict, Optional, Union
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Sequence, Union
 
-from sqlalchemy import select
+from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
-from app.core.security import get_password_hash, verify_password
-from app.crud.base import CRUDBase
+from app.core.cache import principal_cache, response_cache
+from app.core.config import settings
+from app.core.security import (
+    get_password_hash_async,
+    token_revocations,
+    verify_password_async,
+)
+from app.crud.base import CRUDBase, dialect_insert
+from app.models.token_revocation import TokenRevocation
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
 
+# Token version revoking every token of a deleted user
+ALL_TOKENS = 2**31 - 1
+# Changing any of these revokes the user's tokens
+CREDENTIAL_FIELDS = ("email", "hashed_password", "is_active", "is_superuser")
+
+
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     async def get_by_email(self, db: AsyncSession, *, email: str) -> Optional[User]:
         query = select(User).where(User.email == email)
@@ -16,38 +31,119 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         return result.scalars().first()
 
     async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
-        db_obj = User(
-            email=obj_in.email,
-            hashed_password=get_password_hash(obj_in.password),
-            full_name=obj_in.full_name,
-            is_superuser=obj_in.is_superuser,
+        return await self._insert(
+            db,
+            {
+                "email": obj_in.email,
+                "hashed_password": await get_password_hash_async(obj_in.password),
+                "full_name": obj_in.full_name,
+                "is_superuser": obj_in.is_superuser,
+            },
         )
-        db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
 
     async def update(
-        self, db: AsyncSession, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
-    ) -> User:
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: User,
+        obj_in: Union[UserUpdate, Dict[str, Any]],
+        version: Optional[int] = None,
+    ) -> Optional[User]:
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.dict(exclude_unset=True)
         if update_data.get("password"):
-            hashed_password = get_password_hash(update_data["password"])
+            hashed_password = await get_password_hash_async(update_data["password"])
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
-        return await super().update(db, db_obj=db_obj, obj_in=update_data)
+        if any(
+            field in update_data and update_data[field] != getattr(db_obj, field)
+            for field in CREDENTIAL_FIELDS
+        ):
+            update_data = dict(update_data, token_version=User.token_version + 1)
+        user = await super().update(db, db_obj=db_obj, obj_in=update_data, version=version)
+        # Any change, not only to is_active/is_superuser/email/password, makes
+        # cached snapshots stale, and /users/me serves them back verbatim.
+        principal_cache.invalidate_user(db_obj.id)
+        if user is not None and "token_version" in update_data:
+            token_revocations.revoke(user.id, user.token_version)
+        return user
+
+    async def remove(self, db: AsyncSession, *, id: int) -> User:
+        user = await super().remove(db, id=id)
+        principal_cache.invalidate_user(id)
+        if user is not None:
+            token_revocations.revoke(id, ALL_TOKENS)
+        return user
+
+    async def _updated(
+        self, db: AsyncSession, db_obj: User, values: Dict[str, Any], previous: Dict[str, Any]
+    ) -> None:
+        if "token_version" in values:
+            await self._revoke(db, db_obj.id, db_obj.token_version)
+
+    async def _counted(self, db: AsyncSession, db_objs: Sequence[User], sign: int) -> None:
+        if sign < 0:
+            for db_obj in db_objs:
+                await self._revoke(db, db_obj.id, ALL_TOKENS)
+        else:
+            # SQLite may reuse the id of a deleted user.
+            ids = [db_obj.id for db_obj in db_objs]
+            await db.execute(delete(TokenRevocation).where(TokenRevocation.user_id.in_(ids)))
+
+    async def _revoke(self, db: AsyncSession, user_id: int, token_version: int) -> None:
+        query = dialect_insert(db, TokenRevocation.__table__).values(
+            user_id=user_id, token_version=token_version
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[TokenRevocation.user_id],
+            set_={"token_version": query.excluded.token_version, "revoked_at": func.now()},
+        )
+        await db.execute(query)
+
+    async def revocations(self, db: AsyncSession) -> Dict[int, int]:
+        """
+        Lowest valid token version of each user with revoked tokens that may
+        not have expired yet.
+        """
+        since = datetime.now(timezone.utc) - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        query = select(TokenRevocation.user_id, TokenRevocation.token_version).where(
+            TokenRevocation.revoked_at > since
+        )
+        result = await db.execute(query)
+        return dict(result.all())
+
+    async def _written(self, db_obj: User) -> None:
+        await response_cache.invalidate("users")
 
     async def authenticate(self, db: AsyncSession, *, email: str, password: str) -> Optional[User]:
         user = await self.get_by_email(db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return None
         return user
 
+    def snapshot(self, user: User) -> Dict[str, Any]:
+        return {column.key: getattr(user, column.key) for column in User.__table__.columns}
+
+    def from_snapshot(self, snapshot: Dict[str, Any]) -> User:
+        """
+        Rebuild a detached user from `snapshot`; it can be added to a session
+        and updated like a freshly loaded row.
+        """
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return user
+
+    def token_claims(self, user: User) -> Dict[str, Any]:
+        """
+        Claims that let `get_current_principal` authorize `user` without
+        loading the row.
+        """
+        return {"act": user.is_active, "su": user.is_superuser, "ver": user.token_version}
+
     def is_active(self, user: User) -> bool:
         return user.is_active
 
@@ -0,0 +1,33 @@
+from typing import Any, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app import crud, models
+from app.core.config import settings
+from app.db.base import Base
+from app.schemas.user import UserCreate
+
+
+async def create_tables(engine: AsyncEngine) -> None:
+    """
+    Create the tables that don't exist yet. Deployments migrated with
+    Alembic don't need this.
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def create_first_superuser(session_factory: Any) -> Optional[models.User]:
+    """
+    Create FIRST_SUPERUSER unless it exists. Returns the new user, or None.
+    """
+    async with session_factory() as session:
+        if await crud.user.get_by_email(session, email=settings.FIRST_SUPERUSER):
+            return None
+        superuser_in = UserCreate(
+            email=settings.FIRST_SUPERUSER,
+            password=settings.FIRST_SUPERUSER_PASSWORD,
+            is_superuser=True,
+            full_name="Initial Super User",
+        )
+        return await crud.user.create(session, obj_in=superuser_in)
@@ -0,0 +1,211 @@
+import asyncio
+import fnmatch
+import json
+import logging
+import random
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.instrumentation import outbox_lag
+from app.db.session import AsyncSessionLocal
+from app.models.outbox_event import OutboxEvent
+
+logger = logging.getLogger(__name__)
+audit_logger = logging.getLogger("app.audit")
+
+Handler = Callable[[OutboxEvent], Awaitable[None]]
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes; they are UTC.
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+class OutboxWorker:
+    """
+    Delivers outbox events to the handlers subscribed to their topic.
+
+    Events are claimed in batches by pushing their available_at past a lease,
+    so concurrent workers skip them, and deleted once every handler ran.
+    A failed event is released for a retry after a backoff. Delivery is at
+    least once, in no particular order: a worker that dies mid-batch leaves
+    its events to be claimed again when the lease expires, so handlers must
+    be idempotent (the event id identifies a delivery).
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession]):
+        self.session_factory = session_factory
+        self.handlers: List[Tuple[str, Handler]] = []
+        self.delivered = 0
+        self.retried = 0
+        self.failed = 0
+        self.in_flight = 0
+
+    def subscribe(self, pattern: str, handler: Handler) -> None:
+        """
+        Call `handler` with the events whose topic matches `pattern`, e.g.
+        "client.*".
+        """
+        self.handlers.append((pattern, handler))
+
+    async def run(self) -> None:
+        """
+        Deliver events until cancelled, polling every OUTBOX_POLL_SECONDS
+        while idle.
+        """
+        while True:
+            try:
+                claimed = await self.run_once()
+            except Exception:
+                logger.exception("Delivering outbox events failed")
+                claimed = 0
+            if claimed < settings.OUTBOX_BATCH_SIZE:
+                await asyncio.sleep(settings.OUTBOX_POLL_SECONDS)
+
+    async def run_once(self) -> int:
+        """
+        Claim a batch of due events and deliver them, OUTBOX_CONCURRENCY at
+        a time. Returns the number of events claimed.
+        """
+        async with self.session_factory() as db:
+            events = await self._claim(db)
+        semaphore = asyncio.Semaphore(settings.OUTBOX_CONCURRENCY)
+
+        async def deliver(event: OutboxEvent) -> None:
+            async with semaphore:
+                await self._deliver(event)
+
+        await asyncio.gather(*(deliver(event) for event in events))
+        return len(events)
+
+    async def _claim(self, db: AsyncSession) -> List[OutboxEvent]:
+        now = datetime.now(timezone.utc)
+        due = (
+            select(OutboxEvent.id)
+            .where(OutboxEvent.failed_at.is_(None), OutboxEvent.available_at <= now)
+            .order_by(OutboxEvent.available_at, OutboxEvent.id)
+            .limit(settings.OUTBOX_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(due))
+            .values(
+                available_at=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS),
+                attempts=OutboxEvent.attempts + 1,
+            )
+            .returning(OutboxEvent)
+        )
+        events = list(result.scalars().all())
+        await db.commit()
+        return events
+
+    async def _deliver(self, event: OutboxEvent) -> None:
+        self.in_flight += 1
+        try:
+            for pattern, handler in self.handlers:
+                if fnmatch.fnmatchcase(event.topic, pattern):
+                    await handler(event)
+        except Exception as exc:
+            await self._release(event, exc)
+            return
+        finally:
+            self.in_flight -= 1
+        async with self.session_factory() as db:
+            await db.execute(delete(OutboxEvent).where(OutboxEvent.id == event.id))
+            await db.commit()
+        self.delivered += 1
+        lag = datetime.now(timezone.utc) - _utc(event.created_at)
+        outbox_lag.observe(lag.total_seconds(), event.topic)
+
+    async def _release(self, event: OutboxEvent, exc: Exception) -> None:
+        now = datetime.now(timezone.utc)
+        values: Dict[str, Any] = {"last_error": f"{type(exc).__name__}: {exc}"}
+        if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            values["failed_at"] = now
+            self.failed += 1
+            logger.error(
+                "Giving up on outbox event %d (%s) after %d attempts: %s",
+                event.id, event.topic, event.attempts, values["last_error"],
+            )
+        else:
+            # Exponential backoff with jitter, so failing events do not retry
+            # in lockstep
+            delay = min(
+                settings.OUTBOX_RETRY_MAX_SECONDS,
+                settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (event.attempts - 1),
+            )
+            values["available_at"] = now + timedelta(seconds=delay * random.uniform(0.5, 1))
+            self.retried += 1
+            logger.warning(
+                "Outbox event %d (%s) failed, attempt %d: %s",
+                event.id, event.topic, event.attempts, values["last_error"],
+            )
+        async with self.session_factory() as db:
+            await db.execute(update(OutboxEvent).where(OutboxEvent.id == event.id).values(**values))
+            await db.commit()
+
+    async def backlog(self, db: AsyncSession) -> Dict[str, Any]:
+        """
+        Events waiting for delivery, given up events and the age in seconds
+        of the oldest waiting one, across all workers.
+        """
+        result = await db.execute(
+            select(
+                func.count().filter(OutboxEvent.failed_at.is_(None)),
+                func.count().filter(OutboxEvent.failed_at.is_not(None)),
+                func.min(OutboxEvent.created_at).filter(OutboxEvent.failed_at.is_(None)),
+            )
+        )
+        pending, failed, oldest = result.one()
+        age = (datetime.now(timezone.utc) - _utc(oldest)).total_seconds() if oldest else 0.0
+        return {"pending": pending, "failed": failed, "oldest_pending_seconds": age}
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "failed": self.failed,
+            "in_flight": self.in_flight,
+        }
+
+
+async def audit(event: OutboxEvent) -> None:
+    audit_logger.info("%s %s", event.topic, json.dumps(event.payload, sort_keys=True))
+
+
+def _post(url: str, body: bytes, event_id: int) -> None:
+    request = urllib.request.Request(
+        url,
+        data=body,
+        headers={"Content-Type": "application/json", "X-Event-Id": str(event_id)},
+        method="POST",
+    )
+    # Raises HTTPError on non-2xx responses
+    with urllib.request.urlopen(request, timeout=settings.CLIENT_WEBHOOK_TIMEOUT_SECONDS):
+        pass
+
+
+async def notify_webhooks(event: OutboxEvent) -> None:
+    """
+    POST the event to every CLIENT_WEBHOOK_URLS. A retry posts to all of them
+    again; receivers deduplicate on the X-Event-Id header.
+    """
+    body = json.dumps({"id": event.id, "topic": event.topic, "data": event.payload}).encode()
+    for url in settings.CLIENT_WEBHOOK_URLS:
+        await asyncio.to_thread(_post, url, body, event.id)
+
+
+outbox_worker = OutboxWorker(AsyncSessionLocal)
+outbox_worker.subscribe("client.*", audit)
+outbox_worker.subscribe("client.*", notify_webhooks)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(outbox_worker.run())
@@ -0,0 +1,42 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.crud.client import client
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_deleted_clients() -> int:
+    """
+    Permanently delete clients soft-deleted more than CLIENT_PURGE_AFTER_DAYS
+    ago.
+    """
+    deleted_before = datetime.now(timezone.utc) - timedelta(days=settings.CLIENT_PURGE_AFTER_DAYS)
+    async with AsyncSessionLocal() as session:
+        purged = await client.purge(
+            session, deleted_before=deleted_before, batch_size=settings.CLIENT_PURGE_BATCH_SIZE
+        )
+    logger.info("Purged %d deleted clients", purged)
+    return purged
+
+
+async def run_periodically(interval: float) -> None:
+    """
+    Purge every `interval` seconds until cancelled. Started by each worker at
+    startup when CLIENT_PURGE_INTERVAL_SECONDS is set; concurrent runs only
+    race to delete the same rows.
+    """
+    while True:
+        try:
+            await purge_deleted_clients()
+        except Exception:
+            logger.exception("Purging deleted clients failed")
+        await asyncio.sleep(interval)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(purge_deleted_clients())
@@ -0,0 +1,38 @@
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.crud.client import client
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_client_stats() -> int:
+    """
+    Rebuild the per-owner client aggregates from the clients table.
+    """
+    async with AsyncSessionLocal() as session:
+        rebuilt = await client.rebuild_stats(
+            session, batch_size=settings.CLIENT_STATS_RECONCILE_BATCH_SIZE
+        )
+    logger.info("Rebuilt client stats of %d owners", rebuilt)
+    return rebuilt
+
+
+async def run_periodically(interval: float) -> None:
+    """
+    Reconcile every `interval` seconds until cancelled. Started by each worker
+    at startup when CLIENT_STATS_RECONCILE_INTERVAL_SECONDS is set.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await reconcile_client_stats()
+        except Exception:
+            logger.exception("Reconciling client stats failed")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(reconcile_client_stats())
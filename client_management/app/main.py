@@ -1,11 +1,16 @@
 import asyncio
+import json
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.ext.asyncio import create_async_engine
 
 from app.api.v1.api import api_router
+from app.core import security
 from app.core.config import settings
-from app.db.session import engine
+from app.core.instrumentation import SQLInstrumentationMiddleware
+from app.db.session import AsyncSessionLocal, engine, replicas
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_STR}/openapi.json"
@@ -19,43 +24,77 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[
+            "X-Next-Cursor", "X-Total-Count", "X-Total-Count-Type", "ETag", "Server-Timing"
+        ],
     )
 
+app.add_middleware(SQLInstrumentationMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
 @app.on_event("startup")
 async def startup():
-    # Create tables if they don't exist
-    # In production, you'd use Alembic migrations instead
-    from app.db.base import Base
-    from app.models import User, Client
-    
-    async with engine.begin() as conn:
-        # await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
-
-    # Create initial superuser if it doesn't exist
-    from app.db.session import AsyncSessionLocal
-    from app.crud.user import user
-    from app.schemas.user import UserCreate
-    
-    async with AsyncSessionLocal() as session:
-        # Check if superuser exists
-        superuser = await user.get_by_email(session, email=settings.FIRST_SUPERUSER)
-        if not superuser:
-            superuser_in = UserCreate(
-                email=settings.FIRST_SUPERUSER,
-                password=settings.FIRST_SUPERUSER_PASSWORD,
-                is_superuser=True,
-                full_name="Initial Super User",
-            )
-            await user.create(session, obj_in=superuser_in)
+    if settings.OPENAPI_SCHEMA_FILE:
+        load_openapi_schema(settings.OPENAPI_SCHEMA_FILE)
+
+    # Create tables and the initial superuser if they don't exist. In
+    # production, turn this off, use Alembic migrations and run
+    # `python -m app.cli bootstrap` once instead.
+    if settings.STARTUP_BOOTSTRAP:
+        from app.db.init_db import create_first_superuser, create_tables
+
+        await create_tables(engine)
+        await create_first_superuser(AsyncSessionLocal)
+
+    if replicas.engines:
+        app.state.replica_health_task = asyncio.create_task(
+            replicas.run_health_checks(settings.DB_REPLICA_HEALTH_CHECK_SECONDS)
+        )
+
+    if settings.CLIENT_SOFT_DELETE and settings.CLIENT_PURGE_INTERVAL_SECONDS > 0:
+        from app.jobs.purge import run_periodically
+
+        app.state.purge_task = asyncio.create_task(
+            run_periodically(settings.CLIENT_PURGE_INTERVAL_SECONDS)
+        )
+
+    if settings.CLIENT_STATS_RECONCILE_INTERVAL_SECONDS > 0:
+        from app.jobs import reconcile
+
+        app.state.reconcile_task = asyncio.create_task(
+            reconcile.run_periodically(settings.CLIENT_STATS_RECONCILE_INTERVAL_SECONDS)
+        )
+
+    if settings.OUTBOX_WORKER_ENABLED:
+        from app.jobs.outbox import outbox_worker
+
+        app.state.outbox_task = asyncio.create_task(outbox_worker.run())
 
 
 @app.on_event("shutdown")
 async def shutdown():
+    for name in ("outbox_task", "purge_task", "reconcile_task", "replica_health_task"):
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
     await engine.dispose()
+    for replica in replicas.engines:
+        await replica.dispose()
+    security.password_pool.shutdown()
+
+
+def load_openapi_schema(path: str) -> None:
+    """
+    Serve the OpenAPI schema written by `python -m app.cli openapi` instead
+    of building it on the first request.
+    """
+    try:
+        with open(path, "rb") as schema:
+            app.openapi_schema = json.load(schema)
+    except OSError:
+        logger.warning("OpenAPI schema %s not found; it will be generated on demand", path)
 
 
 @app.get("/")
@@ -1,2 +1,6 @@
 from app.models.user import User
-from app.models.client import Client
\ No newline at end of file
+from app.models.client import Client
+from app.models.client_count import ClientCount
+from app.models.client_daily_count import ClientDailyCount
+from app.models.token_revocation import TokenRevocation
+from app.models.outbox_event import OutboxEvent
@@ -1,16 +1,50 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Text
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    DateTime,
+    Text,
+)
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.sql import func
+from sqlalchemy.sql.functions import FunctionElement
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
 
 
+class next_change_seq(FunctionElement):
+    """
+    Change feed position of a client write. On PostgreSQL, the id of the
+    writing transaction, so readers can hold back the writes of transactions
+    still in progress (see CRUDClient.changes); elsewhere (SQLite, whose
+    writes are serialized), one past the highest position.
+    """
+
+    type = BigInteger()
+    inherit_cache = True
+
+
+@compiles(next_change_seq)
+def _next_change_seq(element, compiler, **kw):
+    return "(SELECT coalesce(max(change_seq), 0) + 1 FROM clients)"
+
+
+@compiles(next_change_seq, "postgresql")
+def _next_change_seq_postgresql(element, compiler, **kw):
+    return "pg_current_xact_id()::text::bigint"
+
+
 class Client(Base):
     __tablename__ = "clients"
 
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, index=True, nullable=False)
-    email = Column(String, index=True, unique=True, nullable=False)
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    email = Column(String, nullable=False)
     phone = Column(String)
     address = Column(String)
     notes = Column(Text)
@@ -18,6 +52,50 @@ class Client(Base):
     created_by = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Bumped by every update; identifies the row state in ETags
+    version = Column(Integer, nullable=False, server_default="1")
+    # Set when the client is soft-deleted; the row is purged later
+    deleted_at = Column(DateTime(timezone=True))
+    # Set by every insert, update and soft delete; orders the change feed
+    change_seq = Column(
+        BigInteger, nullable=False, default=next_change_seq(), onupdate=next_change_seq()
+    )
+
+    # Indexes cover live rows only, so a deleted client's email can be reused,
+    # except those of the change feed, which also reports tombstones.
+    __table_args__ = (
+        Index(
+            "ix_clients_email",
+            "email",
+            unique=True,
+            postgresql_where=deleted_at.is_(None),
+            sqlite_where=deleted_at.is_(None),
+        ),
+        Index(
+            "ix_clients_name",
+            "name",
+            postgresql_where=deleted_at.is_(None),
+            sqlite_where=deleted_at.is_(None),
+        ),
+        # Serves owner-scoped listings: filter on created_by, keyset on id.
+        Index(
+            "ix_clients_created_by_id",
+            "created_by",
+            "id",
+            postgresql_where=deleted_at.is_(None),
+            sqlite_where=deleted_at.is_(None),
+        ),
+        # Finds tombstones to purge.
+        Index(
+            "ix_clients_deleted_at",
+            "deleted_at",
+            postgresql_where=deleted_at.isnot(None),
+            sqlite_where=deleted_at.isnot(None),
+        ),
+        # Serve the change feed, of an owner or of everyone.
+        Index("ix_clients_created_by_change_seq", "created_by", "change_seq", "id"),
+        Index("ix_clients_change_seq", "change_seq", "id"),
+    )
 
     # Relationship
     owner = relationship("User", foreign_keys=[created_by])
\ No newline at end of file
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, ForeignKey, Integer
+
+from app.db.base import Base
+
+
+class ClientCount(Base):
+    """
+    Live (not deleted) clients per owner, in total and active, kept in step
+    with the clients table by CRUDClient so owner totals need no count(*).
+    """
+
+    __tablename__ = "client_counts"
+
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    count = Column(Integer, nullable=False, server_default="0")
+    active = Column(Integer, nullable=False, server_default="0")
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Date, ForeignKey, Index, Integer
+
+from app.db.base import Base
+
+
+class ClientDailyCount(Base):
+    """
+    Live clients per owner and UTC day of creation, kept by CRUDClient, so
+    the clients added over a period are a sum of a few rows.
+    """
+
+    __tablename__ = "client_daily_counts"
+
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    created = Column(Integer, nullable=False, server_default="0")
+
+    # Serves the rollup across owners, which only reads recent days.
+    __table_args__ = (Index("ix_client_daily_counts_day", "day"),)
@@ -0,0 +1,35 @@
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class OutboxEvent(Base):
+    """
+    A change to deliver to side-effect handlers, written in the transaction
+    of the change itself and deleted once delivered (see app.jobs.outbox).
+    """
+
+    __tablename__ = "outbox_events"
+
+    id = Column(Integer, primary_key=True)
+    topic = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # Not claimed before this time: the retry backoff, or a claim's lease
+    available_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    attempts = Column(Integer, nullable=False, server_default="0")
+    last_error = Column(Text)
+    # Set when the event gave up after OUTBOX_MAX_ATTEMPTS
+    failed_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # Serves the claim query, which only looks at undelivered events.
+        Index(
+            "ix_outbox_events_pending",
+            "available_at",
+            "id",
+            postgresql_where=failed_at.is_(None),
+            sqlite_where=failed_at.is_(None),
+        ),
+    )
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, DateTime, Integer
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class TokenRevocation(Base):
+    """
+    Tokens of `user_id` with a lower `token_version` are revoked. Rows outlive
+    their user, whose tokens stay valid until they expire otherwise.
+    """
+
+    __tablename__ = "token_revocations"
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    token_version = Column(Integer, nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
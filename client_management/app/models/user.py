@@ -7,11 +7,16 @@ from app.db.base import Base
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     full_name = Column(String, index=True)
     is_active = Column(Boolean(), default=True)
     is_superuser = Column(Boolean(), default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Bumped by every update; identifies the row state in ETags
+    version = Column(Integer, nullable=False, server_default="1")
+    # Bumped when the email, password or roles change; tokens issued for
+    # older versions are revoked
+    token_version = Column(Integer, nullable=False, server_default="1")
\ No newline at end of file
@@ -1,3 +1,20 @@
 from app.schemas.user import User, UserCreate, UserInDB, UserUpdate
-from app.schemas.client import Client, ClientCreate, ClientInDB, ClientUpdate
+from app.schemas.client import (
+    Client,
+    ClientBatchGet,
+    ClientBatchResult,
+    ClientBulkChanges,
+    ClientBulkFilter,
+    ClientBulkResult,
+    ClientBulkRow,
+    ClientBulkSelection,
+    ClientBulkUpdate,
+    ClientBulkWriteResult,
+    ClientChange,
+    ClientChangeFeed,
+    ClientCreate,
+    ClientInDB,
+    ClientStats,
+    ClientUpdate,
+)
 from app.schemas.token import Token, TokenPayload
\ No newline at end of file
@@ -1,7 +1,7 @@
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
 
 
 # Shared properties
@@ -44,4 +44,109 @@ class Client(ClientInDBBase):
 
 # Properties properties stored in DB
 class ClientInDB(ClientInDBBase):
-    pass
\ No newline at end of file
+    pass
+
+
+# A client written since the feed position: its current state, or only its id
+# once deleted
+class ClientChange(BaseModel):
+    id: int
+    deleted: bool
+    client: Optional[Client] = None
+
+
+# A page of the change feed; `since` resumes it, `more` tells whether changes
+# are already waiting past this page
+class ClientChangeFeed(BaseModel):
+    changes: List[ClientChange] = []
+    since: str
+    more: bool
+
+
+# Client totals of an owner, or of everyone; weeks start on Monday, in UTC
+class ClientStats(BaseModel):
+    total: int
+    active: int
+    inactive: int
+    new_this_week: int
+    new_this_month: int
+
+
+# Outcome of one row of a bulk import
+class ClientBulkRow(BaseModel):
+    row: int
+    status: Literal["created", "duplicate", "invalid"]
+    id: Optional[int] = None
+    email: Optional[str] = None
+    detail: Optional[str] = None
+
+
+# Report returned by a bulk import
+class ClientBulkResult(BaseModel):
+    created: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    rows: List[ClientBulkRow] = []
+
+
+# Ids to fetch in one batch
+class ClientBatchGet(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+
+# Clients of a batch fetch, in request order, and the ids not returned
+class ClientBatchResult(BaseModel):
+    clients: List[Client] = []
+    missing: List[int] = []
+
+
+# Clients selected by a bulk write: all of the caller's clients matching every
+# given field
+class ClientBulkFilter(BaseModel):
+    is_active: Optional[bool] = None
+    created_by: Optional[int] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+
+# Target of a bulk write: either explicit ids or a filter
+class ClientBulkSelection(BaseModel):
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=10000)
+    filter: Optional[ClientBulkFilter] = None
+
+    @model_validator(mode="after")
+    def check_one_target(self) -> "ClientBulkSelection":
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Give exactly one of ids or filter")
+        return self
+
+
+# Changes applied by a bulk update; emails are unique, so they can't be set
+class ClientBulkChanges(BaseModel):
+    name: Optional[str] = None
+    phone: Optional[str] = None
+    address: Optional[str] = None
+    notes: Optional[str] = None
+    is_active: Optional[bool] = None
+
+    model_config = {
+        "extra": "forbid"
+    }
+
+    # Omitted fields are left alone, but a name can't be cleared
+    @field_validator("name")
+    @classmethod
+    def check_not_null(cls, value: Optional[str]) -> str:
+        if value is None:
+            raise ValueError("name can't be null")
+        return value
+
+
+class ClientBulkUpdate(ClientBulkSelection):
+    changes: ClientBulkChanges
+
+
+# Outcome of a bulk update or delete
+class ClientBulkWriteResult(BaseModel):
+    affected: int
+    chunks: int
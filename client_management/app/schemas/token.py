@@ -9,4 +9,8 @@ class Token(BaseModel):
 
 
 class TokenPayload(BaseModel):
-    sub: Optional[int] = None
\ No newline at end of file
+    sub: Optional[int] = None
+    # is_active, is_superuser and token_version of the user at issue time
+    act: Optional[bool] = None
+    su: Optional[bool] = None
+    ver: Optional[int] = None
\ No newline at end of file
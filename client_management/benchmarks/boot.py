@@ -0,0 +1,134 @@
+"""
+Cold start benchmark.
+
+Measures what a new worker pays before serving: importing `app.main` (in
+fresh interpreters), the startup hook with and without STARTUP_BOOTSTRAP
+(with the first superuser present, and missing, which costs a bcrypt hash),
+and the first OpenAPI request with the schema built on demand or loaded from
+an OPENAPI_SCHEMA_FILE:
+
+    python -m benchmarks.boot --imports 10 --repeat 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from benchmarks.common import DEFAULT_DATABASE_URL, configure_env, setup_database, summarize
+
+configure_env()
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def time_imports(count: int) -> Dict[str, Any]:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    latencies = []
+    for _ in range(count):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET],
+            cwd=root,
+            env=os.environ,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        latencies.append(float(out.strip().splitlines()[-1]))
+    return summarize(latencies)
+
+
+async def time_async(
+    func: Callable[[], Awaitable[Any]], repeat: int, before: Callable[[], Awaitable[Any]] = None
+) -> Dict[str, float]:
+    latencies: List[float] = []
+    for _ in range(repeat):
+        if before is not None:
+            await before()
+        start = time.perf_counter()
+        await func()
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+async def time_startup(args: argparse.Namespace) -> Dict[str, Any]:
+    from sqlalchemy import delete
+
+    from app import main, models
+    from app.core.config import settings
+
+    engine, session_factory = await setup_database(args.database_url)
+    # Run the startup hook against the benchmark database.
+    main.engine, main.AsyncSessionLocal = engine, session_factory
+
+    async def drop_superuser() -> None:
+        async with session_factory() as session:
+            await session.execute(delete(models.User))
+            await session.commit()
+
+    report = {}
+    settings.STARTUP_BOOTSTRAP = True
+    report["bootstrap_superuser_missing"] = await time_async(
+        main.startup, args.repeat, before=drop_superuser
+    )
+    report["bootstrap_superuser_present"] = await time_async(main.startup, args.repeat)
+    settings.STARTUP_BOOTSTRAP = False
+    report["no_bootstrap"] = await time_async(main.startup, args.repeat)
+    await engine.dispose()
+    return report
+
+
+async def time_openapi(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+
+    from app import cli, main
+    from app.core.config import settings
+
+    url = f"{settings.API_V1_STR}/openapi.json"
+    path = os.path.join(tempfile.gettempdir(), "client_management_openapi.json")
+    cli.openapi(path)
+    transport = httpx.ASGITransport(app=main.app)
+    report = {"schema_bytes": os.path.getsize(path)}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def first_request() -> None:
+            r = await client.get(url)
+            r.raise_for_status()
+
+        async def on_demand() -> None:
+            main.app.openapi_schema = None
+
+        report["on_demand"] = await time_async(first_request, args.repeat, before=on_demand)
+
+        async def load_and_request() -> None:
+            main.load_openapi_schema(path)
+            await first_request()
+
+        report["precompiled"] = await time_async(load_and_request, args.repeat, before=on_demand)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--imports", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    report = {
+        "import_app_main": time_imports(args.imports),
+        "startup": asyncio.run(time_startup(args)),
+        "openapi": asyncio.run(time_openapi(args)),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
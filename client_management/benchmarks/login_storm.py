@@ -0,0 +1,100 @@
+"""
+Login storm benchmark.
+
+Fires concurrent logins, each of which costs a bcrypt verification, while a
+probe keeps requesting the unrelated `GET /` endpoint. The probe latency shows
+how much password work stalls the event loop under each executor mode:
+
+    python -m benchmarks.login_storm --logins 100 --concurrency 10
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import DEFAULT_DATABASE_URL, configure_env, setup_database, summarize
+
+configure_env()
+
+EMAIL = "storm@example.com"
+PASSWORD = "storm-password"
+
+
+async def seed_user(session_factory: Any) -> None:
+    from app import crud, schemas
+
+    async with session_factory() as session:
+        await crud.user.create(session, obj_in=schemas.UserCreate(email=EMAIL, password=PASSWORD))
+
+
+async def run_mode(mode: str, args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+
+    from app.core import security
+    from app.core.config import settings
+    from app.main import app
+
+    security.password_pool = security.PasswordHasherPool(mode=mode, max_workers=args.workers)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = asyncio.Event()
+        probe_latencies: List[float] = []
+        login_latencies: List[float] = []
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def probe() -> None:
+            while not stop.is_set():
+                start = time.perf_counter()
+                r = await client.get("/")
+                r.raise_for_status()
+                probe_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(args.probe_interval)
+
+        async def login() -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                r = await client.post(
+                    f"{settings.API_V1_STR}/login/access-token",
+                    data={"username": EMAIL, "password": PASSWORD},
+                )
+                r.raise_for_status()
+                login_latencies.append(time.perf_counter() - start)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(args.logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe_task
+
+    pool_stats = security.password_pool.stats()
+    security.password_pool.shutdown()
+    return {
+        "mode": mode,
+        "logins_per_sec": round(args.logins / elapsed, 1),
+        "login_latency": summarize(login_latencies),
+        "probe_latency": summarize(probe_latencies),
+        "password_pool": pool_stats,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    _, session_factory = await setup_database(args.database_url)
+    await seed_user(session_factory)
+    report = [await run_mode(mode, args) for mode in args.modes]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--probe-interval", type=float, default=0.005)
+    parser.add_argument(
+        "--modes", nargs="+", default=["inline", "thread", "process"],
+        choices=["inline", "thread", "process"],
+    )
+    asyncio.run(main(parser.parse_args()))
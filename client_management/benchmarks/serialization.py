@@ -0,0 +1,139 @@
+"""
+Response serialization benchmark.
+
+Compares FastAPI's `response_model` path (validate every row into a schema
+instance, then dump it) with the `FAST_SERIALIZATION` path that dumps rows
+directly, first in isolation per page size, then end to end through the
+client listing. Fails if the two paths ever produce different bytes:
+
+    python -m benchmarks.serialization --page-sizes 10 100 1000 --repeat 200
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+from benchmarks.common import DEFAULT_DATABASE_URL, configure_env, setup_database, summarize
+
+configure_env()
+
+
+def make_clients(count: int) -> List[Any]:
+    from app import models
+
+    created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        models.Client(
+            id=i,
+            name=f"Client {i}",
+            email=f"client{i}@example.com",
+            phone=f"555-{i:04d}",
+            address=f"{i} Main Street",
+            notes="Prefers email" if i % 2 else None,
+            is_active=True,
+            created_by=1,
+            created_at=created_at + timedelta(seconds=i),
+            updated_at=None if i % 3 else created_at + timedelta(days=1),
+        )
+        for i in range(count)
+    ]
+
+
+def time_calls(func: Callable[[], bytes], repeat: int) -> List[float]:
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def compare_in_process(page_size: int, repeat: int) -> Dict[str, Any]:
+    from pydantic import TypeAdapter
+
+    from app import schemas
+    from app.api.serialization import client_serializer
+
+    rows = make_clients(page_size)
+    # What FastAPI does for `response_model=List[schemas.Client]`.
+    adapter = TypeAdapter(List[schemas.Client])
+
+    def validated() -> bytes:
+        return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+    def direct() -> bytes:
+        return client_serializer.dump_many(rows)
+
+    assert validated() == direct(), "serialization paths differ"
+    baseline = summarize(time_calls(validated, repeat))
+    fast = summarize(time_calls(direct, repeat))
+    return {
+        "page_size": page_size,
+        "response_model": baseline,
+        "fast": fast,
+        "speedup_p50": round(baseline["p50_ms"] / fast["p50_ms"], 2) if fast["p50_ms"] else None,
+    }
+
+
+async def compare_endpoint(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+
+    from app import crud, schemas
+    from app.core import security
+    from app.core.config import settings
+    from app.main import app
+
+    _, session_factory = await setup_database(args.database_url)
+    async with session_factory() as session:
+        user = await crud.user.create(
+            session, obj_in=schemas.UserCreate(email="serial@example.com", password="serial")
+        )
+        await crud.client.create_many(
+            session,
+            objs_in=[
+                schemas.ClientCreate(name=f"Client {i}", email=f"client{i}@example.com")
+                for i in range(args.endpoint_limit)
+            ],
+            created_by=user.id,
+        )
+    headers = {"Authorization": f"Bearer {security.create_access_token(user.id)}"}
+    url = f"{settings.API_V1_STR}/clients/"
+    params = {"cursor": "", "limit": args.endpoint_limit}
+
+    transport = httpx.ASGITransport(app=app)
+    report: Dict[str, Any] = {"limit": args.endpoint_limit}
+    bodies = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for fast in (False, True):
+            settings.FAST_SERIALIZATION = fast
+            latencies = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                r = await client.get(url, headers=headers, params=params)
+                latencies.append(time.perf_counter() - start)
+                r.raise_for_status()
+            bodies[fast] = r.content
+            report["fast" if fast else "response_model"] = summarize(latencies)
+    assert bodies[False] == bodies[True], "endpoint responses differ"
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--page-sizes", nargs="+", type=int, default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--endpoint-limit", type=int, default=100)
+    args = parser.parse_args()
+
+    report = {
+        "in_process": [compare_in_process(size, args.repeat) for size in args.page_sizes],
+        "endpoint": asyncio.run(compare_endpoint(args)),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
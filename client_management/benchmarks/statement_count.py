@@ -0,0 +1,87 @@
+"""
+Statements per request.
+
+Counts the SQL statements and commits each client endpoint issues, along with
+its mean latency, with the principal cache warm:
+
+    python -m benchmarks.statement_count --requests 200
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event
+
+from benchmarks.common import DEFAULT_DATABASE_URL, configure_env, setup_database
+
+configure_env()
+
+
+async def main(args: argparse.Namespace) -> None:
+    import httpx
+
+    from app import crud, schemas
+    from app.core import security
+    from app.core.config import settings
+    from app.main import app
+
+    engine, session_factory = await setup_database(args.database_url)
+    async with session_factory() as session:
+        user = await crud.user.create(
+            session,
+            obj_in=schemas.UserCreate(email="counter@example.com", password="counter"),
+        )
+    headers = {"Authorization": f"Bearer {security.create_access_token(user.id)}"}
+
+    counts = {"statements": 0, "commits": 0}
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_statement(*_: Any) -> None:
+        counts["statements"] += 1
+
+    @event.listens_for(engine.sync_engine, "commit")
+    def count_commit(*_: Any) -> None:
+        counts["commits"] += 1
+
+    url = f"{settings.API_V1_STR}/clients/"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        (await client.get(f"{settings.API_V1_STR}/users/me", headers=headers)).raise_for_status()
+        ids = []
+
+        async def create(i: int) -> httpx.Response:
+            r = await client.post(
+                url, headers=headers, json={"name": f"C{i}", "email": f"c{i}@example.com"}
+            )
+            ids.append(r.json()["id"])
+            return r
+
+        operations = {
+            "create": create,
+            "read": lambda i: client.get(f"{url}{ids[i]}", headers=headers),
+            "list": lambda i: client.get(url, headers=headers, params={"limit": 100}),
+            "update": lambda i: client.put(f"{url}{ids[i]}", headers=headers, json={"name": f"U{i}"}),
+            "delete": lambda i: client.delete(f"{url}{ids[i]}", headers=headers),
+        }
+        report: Dict[str, Any] = {}
+        for name, operation in operations.items():
+            counts.update(statements=0, commits=0)
+            started = time.perf_counter()
+            for i in range(args.requests):
+                (await operation(i)).raise_for_status()
+            elapsed = time.perf_counter() - started
+            report[name] = {
+                "statements_per_request": counts["statements"] / args.requests,
+                "commits_per_request": counts["commits"] / args.requests,
+                "mean_ms": round(elapsed / args.requests * 1000, 3),
+            }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--requests", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -1,5 +1,6 @@
 from fastapi.testclient import TestClient
 
+from app.core import security
 from app.core.config import settings
 
 
@@ -24,4 +25,80 @@ def test_use_access_token(
     current_user = r.json()
     assert r.status_code == 200
     assert current_user
-    assert current_user["email"] == settings.FIRST_SUPERUSER
\ No newline at end of file
+    assert current_user["email"] == settings.FIRST_SUPERUSER
+
+
+def test_stateless_auth_and_revocation(client: TestClient, monkeypatch) -> None:
+    from jose import jwt
+
+    from app import crud
+    from app.core.cache import principal_cache
+    from app.core.security import token_revocations
+
+    credentials = {"email": "stateless@example.com", "password": "first-secret"}
+    client.post(f"{settings.API_V1_STR}/register", json=credentials)
+
+    def login(password: str) -> dict:
+        r = client.post(
+            f"{settings.API_V1_STR}/login/access-token",
+            data={"username": credentials["email"], "password": password},
+        )
+        token = r.json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    headers = login("first-secret")
+    claims = jwt.get_unverified_claims(headers["Authorization"].split()[1])
+    assert (claims["act"], claims["su"], claims["ver"]) == (True, False, 1)
+
+    monkeypatch.setattr(settings, "STATELESS_AUTH", True)
+    clients_url = f"{settings.API_V1_STR}/clients/"
+    with monkeypatch.context() as m:
+        async def no_user_lookup(*args, **kwargs):
+            raise AssertionError("user row loaded")
+
+        m.setattr(crud.user, "get", no_user_lookup)
+        assert client.get(clients_url, headers=headers).status_code == 200
+        r = client.get(f"{settings.API_V1_STR}/metrics/", headers=headers)
+        assert r.status_code == 400
+
+    # Changing the password revokes the tokens issued before
+    r = client.put(
+        f"{settings.API_V1_STR}/users/me", headers=headers, json={"password": "second-secret"}
+    )
+    assert r.status_code == 200
+    assert client.get(clients_url, headers=headers).status_code == 403
+    assert client.get(f"{settings.API_V1_STR}/users/me", headers=headers).status_code == 403
+    # Other workers learn of it from the database
+    token_revocations.clear()
+    assert client.get(clients_url, headers=headers).status_code == 403
+
+    # Without STATELESS_AUTH, tokens stay valid until they expire
+    monkeypatch.setattr(settings, "STATELESS_AUTH", False)
+    principal_cache.clear()
+    assert client.get(f"{settings.API_V1_STR}/users/me", headers=headers).status_code == 200
+    monkeypatch.setattr(settings, "STATELESS_AUTH", True)
+
+    headers = login("second-secret")
+    assert client.get(clients_url, headers=headers).status_code == 200
+
+
+def test_login_rate_limit(client: TestClient, monkeypatch) -> None:
+    from app.core import rate_limit
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMITS", {"login": "2/minute"})
+    monkeypatch.setattr(
+        rate_limit.rate_limiter, "backend", rate_limit.MemoryRateLimitBackend(maxsize=10)
+    )
+    credentials = {"email": "throttled@example.com", "password": "right"}
+    client.post(f"{settings.API_V1_STR}/register", json=credentials)
+    hashed = security.password_pool.completed
+    login_data = {"username": credentials["email"], "password": "wrong"}
+    url = f"{settings.API_V1_STR}/login/access-token"
+    assert [client.post(url, data=login_data).status_code for _ in range(2)] == [400, 400]
+
+    r = client.post(url, data=login_data)
+    assert r.status_code == 429
+    assert 0 < int(r.headers["Retry-After"]) <= 30
+    # The rejected attempt never reached the password hashing pool
+    assert security.password_pool.completed == hashed + 2
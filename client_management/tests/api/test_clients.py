@@ -0,0 +1,459 @@
+import csv
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+from app import crud, models
+from app.core.cache import response_cache
+from app.core.config import settings
+
+
+def test_read_clients_with_cursor(
+    client: TestClient, superuser_token_headers: dict
+) -> None:
+    for i in range(5):
+        data = {"name": f"Cursor {i}", "email": f"cursor{i}@example.com"}
+        r = client.post(
+            f"{settings.API_V1_STR}/clients/", headers=superuser_token_headers, json=data
+        )
+        assert r.status_code == 200
+
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        r = client.get(
+            f"{settings.API_V1_STR}/clients/",
+            headers=superuser_token_headers,
+            params={"cursor": cursor, "limit": 2},
+        )
+        assert r.status_code == 200
+        page = r.json()
+        assert len(page) <= 2
+        seen.extend(c["id"] for c in page)
+        cursor = r.headers.get("X-Next-Cursor")
+
+    assert seen == sorted(seen)
+    assert len(seen) == len(set(seen)) >= 5
+
+
+def test_read_clients_invalid_cursor(
+    client: TestClient, superuser_token_headers: dict
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/clients/",
+        headers=superuser_token_headers,
+        params={"cursor": "not-a-cursor"},
+    )
+    assert r.status_code == 400
+
+
+def test_read_clients_invalid_limit(
+    client: TestClient, superuser_token_headers: dict
+) -> None:
+    for path in ("clients", "users"):
+        for limit in (0, -1, 1001):
+            r = client.get(
+                f"{settings.API_V1_STR}/{path}/",
+                headers=superuser_token_headers,
+                params={"cursor": "", "limit": limit},
+            )
+            assert r.status_code == 422
+
+
+def test_create_clients_bulk_json(
+    client: TestClient, superuser_token_headers: dict
+) -> None:
+    rows = [
+        {"name": "Bulk 1", "email": "bulk1@example.com"},
+        {"name": "Bulk 2", "email": "bulk2@example.com", "phone": "555-0102"},
+        {"name": "Bulk 1 again", "email": "bulk1@example.com"},
+        {"name": "No email"},
+    ]
+    r = client.post(
+        f"{settings.API_V1_STR}/clients/bulk", headers=superuser_token_headers, json=rows
+    )
+    assert r.status_code == 200
+    report = r.json()
+    assert (report["created"], report["duplicates"], report["invalid"]) == (2, 1, 1)
+    assert [row["status"] for row in report["rows"]] == [
+        "created", "created", "duplicate", "invalid"
+    ]
+
+
+def test_create_clients_bulk_csv(
+    client: TestClient, superuser_token_headers: dict
+) -> None:
+    body = (
+        "name,email,notes\r\n"
+        'CSV 1,csv1@example.com,"multi\r\nline"\r\n'
+        "CSV 2,bulk1@example.com,\r\n"
+    )
+    r = client.post(
+        f"{settings.API_V1_STR}/clients/bulk",
+        headers={**superuser_token_headers, "Content-Type": "text/csv"},
+        content=body,
+    )
+    assert r.status_code == 200
+    report = r.json()
+    assert (report["created"], report["duplicates"], report["invalid"]) == (1, 1, 0)
+
+    client_id = report["rows"][0]["id"]
+    r = client.get(f"{settings.API_V1_STR}/clients/{client_id}", headers=superuser_token_headers)
+    assert r.json()["notes"] == "multi\nline"
+
+
+def test_export_clients(
+    client: TestClient, superuser_token_headers: dict
+) -> None:
+    r = client.get(f"{settings.API_V1_STR}/clients/", headers=superuser_token_headers)
+    expected = [c["email"] for c in r.json()]
+
+    r = client.get(f"{settings.API_V1_STR}/clients/export", headers=superuser_token_headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    exported = [json.loads(line)["email"] for line in r.text.splitlines()]
+    assert sorted(exported) == sorted(expected)
+
+    r = client.get(
+        f"{settings.API_V1_STR}/clients/export",
+        headers=superuser_token_headers,
+        params={"format": "csv"},
+    )
+    assert r.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert [row["email"] for row in rows] == exported
+
+
+def test_update_and_delete_client(
+    client: TestClient, superuser_token_headers: dict
+) -> None:
+    data = {"name": "Before", "email": "lifecycle@example.com"}
+    r = client.post(f"{settings.API_V1_STR}/clients/", headers=superuser_token_headers, json=data)
+    created = r.json()
+    assert created["updated_at"] is None
+
+    r = client.put(
+        f"{settings.API_V1_STR}/clients/{created['id']}",
+        headers=superuser_token_headers,
+        json={"name": "After"},
+    )
+    assert r.status_code == 200
+    updated = r.json()
+    assert updated["name"] == "After"
+    assert updated["email"] == data["email"]
+    assert updated["updated_at"] is not None
+
+    r = client.delete(
+        f"{settings.API_V1_STR}/clients/{created['id']}", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    assert r.json()["name"] == "After"
+    r = client.get(
+        f"{settings.API_V1_STR}/clients/{created['id']}", headers=superuser_token_headers
+    )
+    assert r.status_code == 404
+    r = client.delete(
+        f"{settings.API_V1_STR}/clients/{created['id']}", headers=superuser_token_headers
+    )
+    assert r.status_code == 404
+
+    # The deleted client is kept as a tombstone but frees its email
+    r = client.post(f"{settings.API_V1_STR}/clients/", headers=superuser_token_headers, json=data)
+    assert r.status_code == 200
+    assert r.json()["id"] != created["id"]
+
+
+def test_update_and_delete_client_deleted_meanwhile(
+    client: TestClient, superuser_token_headers: dict, monkeypatch
+) -> None:
+    data = {"name": "Raced", "email": "raced@example.com"}
+    r = client.post(f"{settings.API_V1_STR}/clients/", headers=superuser_token_headers, json=data)
+    url = f"{settings.API_V1_STR}/clients/{r.json()['id']}"
+    etag = client.get(url, headers=superuser_token_headers).headers["ETag"]
+    client.delete(url, headers=superuser_token_headers)
+
+    # Load the client as it was before another request deleted it
+    async def stale_get(db, id):
+        return await db.get(models.Client, id)
+
+    monkeypatch.setattr(crud.client, "get", stale_get)
+    r = client.put(url, headers=superuser_token_headers, json={"name": "Lost"})
+    assert r.status_code == 404
+    r = client.put(url, headers={**superuser_token_headers, "If-Match": etag}, json={"name": "Lost"})
+    assert r.status_code == 412
+    r = client.delete(url, headers=superuser_token_headers)
+    assert r.status_code == 404
+
+
+def test_search_clients(
+    client: TestClient, superuser_token_headers: dict
+) -> None:
+    rows = [
+        {"name": "Search Alpha", "email": "alpha.search@example.com", "phone": "555-9001"},
+        {"name": "Search Beta", "email": "beta.search@example.com", "notes": "alpha 100%"},
+    ]
+    for data in rows:
+        r = client.post(f"{settings.API_V1_STR}/clients/", headers=superuser_token_headers, json=data)
+        assert r.status_code == 200
+
+    r = client.get(
+        f"{settings.API_V1_STR}/clients/search",
+        headers=superuser_token_headers,
+        params={"q": "alpha search"},
+    )
+    assert r.status_code == 200
+    assert [c["name"] for c in r.json()] == ["Search Alpha", "Search Beta"]
+
+    r = client.get(
+        f"{settings.API_V1_STR}/clients/search",
+        headers=superuser_token_headers,
+        params={"q": "100%"},
+    )
+    assert [c["name"] for c in r.json()] == ["Search Beta"]
+
+    r = client.get(
+        f"{settings.API_V1_STR}/clients/search", headers=superuser_token_headers, params={"q": ""}
+    )
+    assert r.status_code == 422
+
+    r = client.get(
+        f"{settings.API_V1_STR}/clients/search", headers=superuser_token_headers, params={"q": "al"}
+    )
+    assert r.status_code == 422
+
+
+def test_fast_serialization_is_byte_identical(
+    client: TestClient, superuser_token_headers: dict, monkeypatch
+) -> None:
+    data = {"name": "Fast Ünïcode", "email": "fast@example.com", "notes": "a\n\"b\""}
+    r = client.post(f"{settings.API_V1_STR}/clients/", headers=superuser_token_headers, json=data)
+    client_id = r.json()["id"]
+    urls = [
+        (f"{settings.API_V1_STR}/clients/", {"cursor": "", "limit": 3}),
+        (f"{settings.API_V1_STR}/clients/", {}),
+        (f"{settings.API_V1_STR}/clients/search", {"q": "fast"}),
+        (f"{settings.API_V1_STR}/clients/{client_id}", {}),
+    ]
+
+    def fetch(fast: bool) -> list:
+        monkeypatch.setattr(settings, "FAST_SERIALIZATION", fast)
+        responses = [
+            client.get(url, headers=superuser_token_headers, params=params) for url, params in urls
+        ]
+        return [(r.status_code, r.headers.get("X-Next-Cursor"), r.content) for r in responses]
+
+    assert fetch(True) == fetch(False)
+
+
+def test_client_etags(
+    client: TestClient, superuser_token_headers: dict
+) -> None:
+    data = {"name": "Tagged", "email": "tagged@example.com"}
+    r = client.post(f"{settings.API_V1_STR}/clients/", headers=superuser_token_headers, json=data)
+    url = f"{settings.API_V1_STR}/clients/{r.json()['id']}"
+
+    r = client.get(url, headers=superuser_token_headers)
+    etag = r.headers["ETag"]
+    r = client.get(url, headers={**superuser_token_headers, "If-None-Match": f"W/{etag}"})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["ETag"] == etag
+
+    r = client.put(
+        url, headers={**superuser_token_headers, "If-Match": etag}, json={"name": "Retagged"}
+    )
+    assert r.status_code == 200
+    new_etag = r.headers["ETag"]
+    assert new_etag != etag
+
+    r = client.put(
+        url, headers={**superuser_token_headers, "If-Match": etag}, json={"name": "Lost update"}
+    )
+    assert r.status_code == 412
+    r = client.get(url, headers={**superuser_token_headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["name"] == "Retagged"
+    assert r.headers["ETag"] == new_etag
+
+
+def test_read_clients_total_count(
+    client: TestClient, superuser_token_headers: dict, monkeypatch
+) -> None:
+    url = f"{settings.API_V1_STR}/clients/"
+    data = {"name": "Counted", "email": "counted@example.com"}
+    client.post(url, headers=superuser_token_headers, json=data)
+    r = client.get(url, headers=superuser_token_headers, params={"limit": 1000})
+    assert "X-Total-Count" not in r.headers
+    total = len(r.json())
+
+    r = client.get(url, headers=superuser_token_headers, params={"count": "exact"})
+    assert r.headers["X-Total-Count"] == str(total)
+    assert r.headers["X-Total-Count-Type"] == "exact"
+    # Without PostgreSQL statistics the estimate sums the per-owner counters
+    r = client.get(url, headers=superuser_token_headers, params={"count": "estimate"})
+    assert r.headers["X-Total-Count"] == str(total)
+    assert r.headers["X-Total-Count-Type"] == "estimate"
+
+    monkeypatch.setattr(settings, "CLIENT_COUNT_EXACT_CAP", 1)
+    r = client.get(url, headers=superuser_token_headers, params={"count": "exact"})
+    assert r.headers["X-Total-Count"] == "1"
+    assert r.headers["X-Total-Count-Type"] == "lower-bound"
+
+
+def test_list_clients_response_cache(
+    client: TestClient, superuser_token_headers: dict, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+    url = f"{settings.API_V1_STR}/clients/"
+    params = {"cursor": "", "limit": 1}
+    hits = response_cache.hits
+
+    first = client.get(url, headers=superuser_token_headers, params=params)
+    second = client.get(url, headers=superuser_token_headers, params=params)
+    assert response_cache.hits == hits + 1
+    assert second.content == first.content
+    assert second.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+
+    r = client.get(url, headers=superuser_token_headers)
+    before = r.json()
+    data = {"name": "Cached", "email": "cached@example.com"}
+    client.post(url, headers=superuser_token_headers, json=data)
+    r = client.get(url, headers=superuser_token_headers)
+    assert len(r.json()) == len(before) + 1
+
+
+def test_read_clients_batch(
+    client: TestClient, superuser_token_headers: dict
+) -> None:
+    ids = []
+    for i in range(3):
+        data = {"name": f"Batch {i}", "email": f"batch{i}@example.com"}
+        r = client.post(f"{settings.API_V1_STR}/clients/", headers=superuser_token_headers, json=data)
+        ids.append(r.json()["id"])
+
+    requested = [ids[2], 999999, ids[0], ids[2]]
+    r = client.post(
+        f"{settings.API_V1_STR}/clients/batch-get",
+        headers=superuser_token_headers,
+        json={"ids": requested},
+    )
+    assert r.status_code == 200
+    result = r.json()
+    assert [c["id"] for c in result["clients"]] == [ids[2], ids[0]]
+    assert result["missing"] == [999999]
+
+    r = client.post(
+        f"{settings.API_V1_STR}/clients/batch-get", headers=superuser_token_headers, json={"ids": []}
+    )
+    assert r.status_code == 422
+
+
+def test_update_and_delete_clients_bulk(
+    client: TestClient, superuser_token_headers: dict, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "BULK_WRITE_CHUNK_SIZE", 2)
+    rows = [{"name": f"Mass {i}", "email": f"mass{i}@example.com"} for i in range(5)]
+    r = client.post(f"{settings.API_V1_STR}/clients/bulk", headers=superuser_token_headers, json=rows)
+    ids = [row["id"] for row in r.json()["rows"]]
+
+    r = client.patch(
+        f"{settings.API_V1_STR}/clients/bulk",
+        headers=superuser_token_headers,
+        json={"ids": ids, "changes": {"is_active": False}},
+    )
+    assert r.status_code == 200
+    assert r.json() == {"affected": 5, "chunks": 3}
+    r = client.get(f"{settings.API_V1_STR}/clients/{ids[0]}", headers=superuser_token_headers)
+    assert r.json()["is_active"] is False
+
+    r = client.patch(
+        f"{settings.API_V1_STR}/clients/bulk",
+        headers=superuser_token_headers,
+        json={"ids": ids, "changes": {"email": "same@example.com"}},
+    )
+    assert r.status_code == 422
+    r = client.patch(
+        f"{settings.API_V1_STR}/clients/bulk",
+        headers=superuser_token_headers,
+        json={"ids": ids, "changes": {"name": None}},
+    )
+    assert r.status_code == 422
+
+    r = client.request(
+        "DELETE",
+        f"{settings.API_V1_STR}/clients/bulk",
+        headers=superuser_token_headers,
+        json={"filter": {"is_active": False}},
+    )
+    assert r.status_code == 200
+    assert r.json()["affected"] == 5
+    r = client.post(
+        f"{settings.API_V1_STR}/clients/batch-get", headers=superuser_token_headers, json={"ids": ids}
+    )
+    assert r.json()["missing"] == ids
+
+
+def test_read_client_changes(
+    client: TestClient, superuser_token_headers: dict, monkeypatch
+) -> None:
+    url = f"{settings.API_V1_STR}/clients/changes"
+
+    def drain(since):
+        changes = []
+        while True:
+            r = client.get(url, headers=superuser_token_headers, params={"since": since, "limit": 2})
+            assert r.status_code == 200
+            feed = r.json()
+            changes.extend(feed["changes"])
+            since = feed["since"]
+            if not feed["more"]:
+                return changes, since
+
+    _, since = drain("")
+    ids = []
+    for i in range(3):
+        data = {"name": f"Feed {i}", "email": f"feed{i}@example.com"}
+        r = client.post(f"{settings.API_V1_STR}/clients/", headers=superuser_token_headers, json=data)
+        ids.append(r.json()["id"])
+    client.put(
+        f"{settings.API_V1_STR}/clients/{ids[0]}", headers=superuser_token_headers, json={"phone": "1"}
+    )
+    client.delete(f"{settings.API_V1_STR}/clients/{ids[1]}", headers=superuser_token_headers)
+
+    changes, since = drain(since)
+    assert [c["id"] for c in changes] == [ids[2], ids[0], ids[1]]
+    assert changes[1]["client"]["phone"] == "1"
+    assert changes[2] == {"id": ids[1], "deleted": True, "client": None}
+    assert drain(since)[0] == []
+
+    r = client.get(url, headers=superuser_token_headers, params={"since": "not-a-token"})
+    assert r.status_code == 400
+    monkeypatch.setattr(settings, "CLIENT_PURGE_AFTER_DAYS", -1)
+    r = client.get(url, headers=superuser_token_headers, params={"since": since})
+    assert r.status_code == 410
+    monkeypatch.setattr(settings, "CLIENT_SOFT_DELETE", False)
+    r = client.get(url, headers=superuser_token_headers)
+    assert r.status_code == 404
+
+
+def test_read_client_stats(client: TestClient, superuser_token_headers: dict) -> None:
+    url = f"{settings.API_V1_STR}/clients/stats"
+    me = client.get(f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers).json()
+    before = client.get(url, headers=superuser_token_headers, params={"owner_id": me["id"]}).json()
+    for i in range(2):
+        data = {"name": f"Stats {i}", "email": f"api-stats{i}@example.com", "is_active": i == 0}
+        r = client.post(f"{settings.API_V1_STR}/clients/", headers=superuser_token_headers, json=data)
+        assert r.status_code == 200
+
+    r = client.get(url, headers=superuser_token_headers, params={"owner_id": me["id"]})
+    assert r.status_code == 200
+    mine = r.json()
+    assert mine["total"] == before["total"] + 2
+    assert mine["active"] == before["active"] + 1
+    assert mine["new_this_week"] == before["new_this_week"] + 2
+
+    r = client.get(url, headers=superuser_token_headers)
+    everyone = r.json()
+    assert everyone["total"] >= mine["total"]
+    assert everyone["total"] == everyone["active"] + everyone["inactive"]
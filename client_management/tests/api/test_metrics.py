@@ -0,0 +1,44 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+def test_read_metrics(client: TestClient, superuser_token_headers: dict) -> None:
+    r = client.get(f"{settings.API_V1_STR}/metrics/", headers=superuser_token_headers)
+    assert r.status_code == 200
+    metrics = r.json()
+    assert {"db_pool", "password_hashing", "principal_cache"} <= set(metrics)
+    assert metrics["db_pool"]["class"] == "InstrumentedQueuePool"
+    assert {"pending", "failed", "delivered", "in_flight"} <= set(metrics["outbox"])
+
+
+def test_server_timing_header(client: TestClient, superuser_token_headers: dict) -> None:
+    r = client.get(f"{settings.API_V1_STR}/clients/", headers=superuser_token_headers)
+    assert r.status_code == 200
+    timing = r.headers["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    statements = int(timing.split('desc="')[1].split()[0])
+    assert statements >= 1
+
+
+def test_read_prometheus_metrics(client: TestClient, superuser_token_headers: dict) -> None:
+    client.get(f"{settings.API_V1_STR}/clients/12345", headers=superuser_token_headers)
+    r = client.get(f"{settings.API_V1_STR}/metrics/prometheus", headers=superuser_token_headers)
+    assert r.status_code == 200
+    assert "# TYPE http_request_db_statements histogram" in r.text
+    route = f'route="{settings.API_V1_STR}/clients/{{client_id}}",status="404"'
+    assert f'http_request_duration_seconds_count{{method="GET",{route}}} ' in r.text
+
+
+def test_slow_query_log_omits_values(monkeypatch, caplog) -> None:
+    from sqlalchemy import create_engine, text
+
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0.000001)
+    engine = create_engine("sqlite://")
+    with caplog.at_level("WARNING", logger="app.db.slow_query"):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT :secret, :n"), {"secret": "hunter2", "n": 1})
+    message = caplog.records[-1].getMessage()
+    assert "SELECT ?, ?" in message
+    assert "(str, int)" in message
+    assert "hunter2" not in message
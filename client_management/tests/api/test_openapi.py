@@ -0,0 +1,19 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app import cli, main
+from app.core.config import settings
+
+
+def test_precompiled_openapi_schema(client: TestClient, tmp_path, monkeypatch) -> None:
+    path = tmp_path / "openapi.json"
+    cli.openapi(str(path))
+    schema = json.loads(path.read_text())
+    assert f"{settings.API_V1_STR}/clients/" in schema["paths"]
+
+    monkeypatch.setattr(main.app, "openapi_schema", None)
+    main.load_openapi_schema(str(path))
+    assert main.app.openapi_schema == schema
+    r = client.get(f"{settings.API_V1_STR}/openapi.json")
+    assert r.json() == schema
@@ -0,0 +1,69 @@
+from fastapi.testclient import TestClient
+
+from app.core.cache import principal_cache
+from app.core.config import settings
+
+
+def test_current_user_is_cached(
+    client: TestClient, superuser_token_headers: dict
+) -> None:
+    principal_cache.clear()
+    hits = principal_cache.stats()["hits"]
+    for _ in range(3):
+        r = client.get(f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers)
+        assert r.status_code == 200
+    assert principal_cache.stats()["hits"] == hits + 2
+
+
+def test_update_user_me_invalidates_cache(
+    client: TestClient, superuser_token_headers: dict
+) -> None:
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers)
+    assert r.status_code == 200
+    r = client.put(
+        f"{settings.API_V1_STR}/users/me",
+        headers=superuser_token_headers,
+        json={"full_name": "Renamed Super User"},
+    )
+    assert r.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers)
+    assert r.json()["full_name"] == "Renamed Super User"
+
+
+def test_fast_serialization_is_byte_identical(
+    client: TestClient, superuser_token_headers: dict, monkeypatch
+) -> None:
+    me = client.get(f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers).json()
+    urls = [
+        (f"{settings.API_V1_STR}/users/", {"cursor": ""}),
+        (f"{settings.API_V1_STR}/users/me", {}),
+        (f"{settings.API_V1_STR}/users/{me['id']}", {}),
+    ]
+
+    def fetch(fast: bool) -> list:
+        monkeypatch.setattr(settings, "FAST_SERIALIZATION", fast)
+        responses = [
+            client.get(url, headers=superuser_token_headers, params=params) for url, params in urls
+        ]
+        return [(r.status_code, r.content) for r in responses]
+
+    assert fetch(True) == fetch(False)
+
+
+def test_user_me_etags(
+    client: TestClient, superuser_token_headers: dict
+) -> None:
+    url = f"{settings.API_V1_STR}/users/me"
+    etag = client.get(url, headers=superuser_token_headers).headers["ETag"]
+    r = client.get(url, headers={**superuser_token_headers, "If-None-Match": etag})
+    assert r.status_code == 304
+
+    r = client.put(url, headers={**superuser_token_headers, "If-Match": '"0-0"'}, json={})
+    assert r.status_code == 412
+    r = client.put(
+        url, headers={**superuser_token_headers, "If-Match": etag}, json={"full_name": "Tagged"}
+    )
+    assert r.status_code == 200
+    r = client.get(url, headers={**superuser_token_headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
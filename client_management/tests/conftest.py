@@ -8,8 +8,9 @@ from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 from app.main import app
-from app.api.deps import get_db
+from app.api.deps import get_db, get_read_db
 from app.db.base import Base
+from app.db.init_db import create_first_superuser
 
 # Use an in-memory SQLite database for testing
 SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -18,7 +19,7 @@ engine = create_async_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
 TestingSessionLocal = sessionmaker(
-    autocommit=False, autoflush=False, bind=engine, class_=AsyncSession
+    autocommit=False, autoflush=False, bind=engine, class_=AsyncSession, expire_on_commit=False
 )
 
 
@@ -28,6 +29,13 @@ async def override_get_db() -> Generator:
 
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
+# The suite logs in more often than the default limits allow
+settings.RATE_LIMIT_ENABLED = False
+# The test database is set up by the fixtures below, not by app startup
+settings.STARTUP_BOOTSTRAP = False
+settings.CLIENT_PURGE_INTERVAL_SECONDS = 0
+settings.OUTBOX_WORKER_ENABLED = False
 
 
 @pytest.fixture(scope="session")
@@ -41,11 +49,18 @@ def event_loop():
 async def create_tables():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    await create_first_superuser(TestingSessionLocal)
     yield
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
 
 
+@pytest.fixture
+async def db(create_tables) -> Generator:
+    async with TestingSessionLocal() as session:
+        yield session
+
+
 @pytest.fixture(scope="module")
 def client(create_tables) -> Generator:
     with TestClient(app) as c:
@@ -54,21 +69,6 @@ def client(create_tables) -> Generator:
 
 @pytest.fixture(scope="module")
 async def superuser_token_headers(client: TestClient) -> Dict[str, str]:
-    from app.crud.user import user
-    from app.schemas.user import UserCreate
-    
-    async with TestingSessionLocal() as session:
-        # Create superuser if it doesn't exist
-        superuser = await user.get_by_email(session, email=settings.FIRST_SUPERUSER)
-        if not superuser:
-            superuser_in = UserCreate(
-                email=settings.FIRST_SUPERUSER,
-                password=settings.FIRST_SUPERUSER_PASSWORD,
-                is_superuser=True,
-                full_name="Initial Super User",
-            )
-            await user.create(session, obj_in=superuser_in)
-    
     login_data = {
         "username": settings.FIRST_SUPERUSER,
         "password": settings.FIRST_SUPERUSER_PASSWORD,
@@ -0,0 +1,72 @@
+import asyncio
+from typing import Dict, List, Optional
+
+from app.core.cache import MemoryCacheBackend, RedisCacheBackend, ResponseCache
+
+
+class FakeRedis:
+    """
+    In-process stand-in for the parts of the redis.asyncio API the cache uses.
+    """
+
+    def __init__(self) -> None:
+        self.data: Dict[str, bytes] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: bytes, ex: Optional[int] = None) -> None:
+        self.data[key] = value
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [self.data.get(key) for key in keys]
+
+    async def incr(self, key: str) -> int:
+        value = int(self.data.get(key, 0)) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+
+async def test_concurrent_misses_are_coalesced() -> None:
+    cache = ResponseCache(MemoryCacheBackend(maxsize=10, ttl=60), ttl=60)
+    calls = 0
+
+    async def compute() -> bytes:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return b"page"
+
+    values = await asyncio.gather(*(cache.get_or_set("key", ["clients"], compute) for _ in range(20)))
+    assert values == [b"page"] * 20
+    assert calls == 1
+    assert (cache.misses, cache.coalesced) == (1, 19)
+
+
+async def test_coalesced_waiters_share_errors() -> None:
+    cache = ResponseCache(MemoryCacheBackend(maxsize=10, ttl=60), ttl=60)
+
+    async def compute() -> bytes:
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        *(cache.get_or_set("key", ["clients"], compute) for _ in range(3)), return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+async def test_invalidation_with_redis_backend() -> None:
+    cache = ResponseCache(RedisCacheBackend(FakeRedis()), ttl=60)
+    version = 0
+
+    async def compute() -> bytes:
+        return f"v{version}".encode()
+
+    assert await cache.get_or_set("key", ["clients:owner:1"], compute) == b"v0"
+    version = 1
+    assert await cache.get_or_set("key", ["clients:owner:1"], compute) == b"v0"
+    await cache.invalidate("clients:owner:2")
+    assert await cache.get_or_set("key", ["clients:owner:1"], compute) == b"v0"
+    await cache.invalidate("clients:owner:1")
+    assert await cache.get_or_set("key", ["clients:owner:1"], compute) == b"v1"
@@ -0,0 +1,27 @@
+import copy
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.instrumentation import RequestStats, request_stats
+
+
+async def test_failing_statements_leave_no_timing_behind() -> None:
+    db_engine = create_async_engine("sqlite+aiosqlite://")
+    stats = RequestStats({})
+    token = request_stats.set(stats)
+    try:
+        async with db_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            info = copy.deepcopy(conn.info)
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    await conn.execute(text("SELECT * FROM missing"))
+            assert conn.info == info
+            await conn.execute(text("SELECT 1"))
+    finally:
+        request_stats.reset(token)
+        await db_engine.dispose()
+    assert stats.statements == 2
@@ -0,0 +1,28 @@
+import pytest
+
+from app.core.rate_limit import MemoryRateLimitBackend, parse_limit
+
+
+def test_parse_limit() -> None:
+    assert parse_limit("10/minute") == (10 / 60, 10.0)
+    assert parse_limit(" 3 / second ") == (3.0, 3.0)
+    with pytest.raises(ValueError):
+        parse_limit("10 per minute")
+
+
+async def test_memory_backend_token_bucket(monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr("app.core.rate_limit.time.monotonic", lambda: now[0])
+    backend = MemoryRateLimitBackend(maxsize=2)
+    rate, burst = parse_limit("2/second")
+
+    assert [await backend.take("a", rate, burst) for _ in range(2)] == [0.0, 0.0]
+    assert await backend.take("a", rate, burst) == pytest.approx(0.5)
+    now[0] += 0.5
+    assert await backend.take("a", rate, burst) == 0.0
+
+    # The least recently used bucket is dropped past maxsize
+    await backend.take("b", rate, burst)
+    await backend.take("c", rate, burst)
+    assert len(backend) == 2
+    assert await backend.take("a", rate, burst) == 0.0
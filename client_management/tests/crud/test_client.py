@@ -0,0 +1,232 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.models.client import Client
+from app.models.client_count import ClientCount
+from app.models.client_daily_count import ClientDailyCount
+from app.schemas.client import ClientCreate, ClientUpdate
+from app.schemas.user import UserCreate
+
+
+async def test_owner_listings_use_owner_index(db: AsyncSession) -> None:
+    owner = await crud.user.create(
+        db, obj_in=UserCreate(email="owner-index@example.com", password="secret")
+    )
+    for i in range(3):
+        await crud.client.create(
+            db,
+            obj_in=ClientCreate(name=f"Owned {i}", email=f"owned{i}@example.com"),
+            created_by=owner.id,
+        )
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    bind = db.get_bind()
+    event.listen(bind, "before_cursor_execute", capture)
+    try:
+        page, cursor = await crud.client.get_page_by_owner(db, owner_id=owner.id, limit=2)
+        await crud.client.get_page_by_owner(db, owner_id=owner.id, cursor=cursor, limit=2)
+        clients = await crud.client.get_multi_by_owner(db, owner_id=owner.id, limit=2)
+    finally:
+        event.remove(bind, "before_cursor_execute", capture)
+
+    assert [c.id for c in clients] == [c.id for c in page]
+    assert len(statements) == 3
+    conn = await db.connection()
+    for statement, parameters in statements:
+        result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        plan = " | ".join(row[-1] for row in result)
+        assert "USING INDEX ix_clients_created_by_id" in plan, plan
+        assert "TEMP B-TREE" not in plan, plan
+
+
+async def test_get_many_filters_owner_in_sql(db: AsyncSession) -> None:
+    owner = await crud.user.create(
+        db, obj_in=UserCreate(email="many-owner@example.com", password="secret")
+    )
+    other = await crud.user.create(
+        db, obj_in=UserCreate(email="many-other@example.com", password="secret")
+    )
+    mine = await crud.client.create(
+        db, obj_in=ClientCreate(name="Mine", email="many-mine@example.com"), created_by=owner.id
+    )
+    theirs = await crud.client.create(
+        db, obj_in=ClientCreate(name="Theirs", email="many-theirs@example.com"), created_by=other.id
+    )
+
+    clients = await crud.client.get_many(db, [theirs.id, mine.id], owner_id=owner.id)
+    assert [c.id for c in clients] == [mine.id]
+    clients = await crud.client.get_many(db, [theirs.id, mine.id])
+    assert [c.id for c in clients] == [theirs.id, mine.id]
+
+
+async def test_bulk_writes_are_limited_to_owner(db: AsyncSession) -> None:
+    owner = await crud.user.create(
+        db, obj_in=UserCreate(email="bulk-owner@example.com", password="secret")
+    )
+    other = await crud.user.create(
+        db, obj_in=UserCreate(email="bulk-other@example.com", password="secret")
+    )
+    mine = await crud.client.create_many(
+        db,
+        objs_in=[ClientCreate(name=f"Mine {i}", email=f"bulk-mine{i}@example.com") for i in range(3)],
+        created_by=owner.id,
+    )
+    theirs = await crud.client.create_many(
+        db,
+        objs_in=[ClientCreate(name="Theirs", email="bulk-theirs@example.com")],
+        created_by=other.id,
+    )
+
+    affected, chunks = await crud.client.update_many(
+        db, changes={"notes": "bulk"}, ids=mine + theirs, owner_id=owner.id, chunk_size=0
+    )
+    assert (affected, chunks) == (3, 1)
+    affected, chunks = await crud.client.remove_many(db, owner_id=owner.id, chunk_size=2)
+    assert (affected, chunks) == (3, 3)
+    assert [c.id for c in await crud.client.get_many(db, mine + theirs)] == theirs
+    assert (await crud.client.get(db, theirs[0])).notes is None
+
+
+async def test_soft_deleted_clients_are_hidden_until_purged(db: AsyncSession) -> None:
+    owner = await crud.user.create(
+        db, obj_in=UserCreate(email="purge-owner@example.com", password="secret")
+    )
+    ids = await crud.client.create_many(
+        db,
+        objs_in=[ClientCreate(name=f"Purge {i}", email=f"purge{i}@example.com") for i in range(3)],
+        created_by=owner.id,
+    )
+    assert (await crud.client.remove(db, id=ids[0])).id == ids[0]
+    assert await crud.client.remove(db, id=ids[0]) is None
+    assert await crud.client.remove_many(db, ids=ids[1:2], owner_id=owner.id) == (1, 1)
+
+    assert await crud.client.get(db, ids[0]) is None
+    assert await crud.client.get_by_email(db, email="purge1@example.com") is None
+    listed = await crud.client.get_multi_by_owner(db, owner_id=owner.id)
+    assert [c.id for c in listed] == ids[2:]
+    assert await crud.client.update(db, db_obj=listed[0], obj_in={"notes": "x"}) is not None
+
+    stored = select(Client.id).where(Client.created_by == owner.id)
+    assert len((await db.execute(stored)).all()) == 3
+    now = datetime.now(timezone.utc)
+    assert await crud.client.purge(db, deleted_before=now - timedelta(days=1)) == 0
+    assert await crud.client.purge(db, deleted_before=now + timedelta(minutes=1), batch_size=1) >= 2
+    assert [id for id, in (await db.execute(stored)).all()] == ids[2:]
+
+
+async def test_owner_counts_follow_writes(db: AsyncSession) -> None:
+    owner = await crud.user.create(
+        db, obj_in=UserCreate(email="count-owner@example.com", password="secret")
+    )
+    created = await crud.client.create(
+        db, obj_in=ClientCreate(name="Count", email="count@example.com"), created_by=owner.id
+    )
+    ids = await crud.client.create_many(
+        db,
+        objs_in=[ClientCreate(name=f"Count {i}", email=f"count{i}@example.com") for i in range(4)]
+        + [ClientCreate(name="Duplicate", email="count@example.com")],
+        created_by=owner.id,
+    )
+    assert await crud.client.count_estimate(db, owner_id=owner.id) == 5
+    await crud.client.remove(db, id=created.id)
+    await crud.client.remove(db, id=created.id)
+    await crud.client.remove_many(db, ids=ids[:2], owner_id=owner.id, chunk_size=1)
+    assert await crud.client.count_estimate(db, owner_id=owner.id) == 2
+    assert await crud.client.count(db, owner_id=owner.id) == 2
+    assert await crud.client.count(db, owner_id=owner.id, cap=1) == 2
+
+
+async def test_changes_are_owner_scoped_and_follow_bulk_writes(db: AsyncSession) -> None:
+    owner = await crud.user.create(
+        db, obj_in=UserCreate(email="changes-owner@example.com", password="secret")
+    )
+    owner_id = owner.id
+    created = await crud.client.create_many(
+        db,
+        objs_in=[ClientCreate(name=f"Change {i}", email=f"change{i}@example.com") for i in range(3)],
+        created_by=owner_id,
+    )
+    ids = sorted(created)
+    await crud.client.create(
+        db, obj_in=ClientCreate(name="Other", email="change-other@example.com"), created_by=1
+    )
+
+    changes = await crud.client.changes(db, owner_id=owner_id)
+    assert [c.id for c in changes] == ids
+    after = (changes[-1].change_seq, changes[-1].id)
+
+    await crud.client.update_many(db, changes={"is_active": False}, ids=ids[:1])
+    await crud.client.remove_many(db, ids=ids[1:2])
+    db.expire_all()
+    changes = await crud.client.changes(db, owner_id=owner_id, after=after)
+    assert [(c.id, c.deleted_at is not None) for c in changes] == [(ids[0], False), (ids[1], True)]
+
+
+async def test_stats_follow_writes_and_rebuild(db: AsyncSession) -> None:
+    owner = await crud.user.create(
+        db, obj_in=UserCreate(email="stats-owner@example.com", password="secret")
+    )
+    owner_id = owner.id
+    ids = await crud.client.create_many(
+        db,
+        objs_in=[ClientCreate(name=f"Stats {i}", email=f"stats{i}@example.com") for i in range(4)],
+        created_by=owner_id,
+    )
+    obj = await crud.client.get(db, ids[0])
+    await crud.client.update(db, db_obj=obj, obj_in=ClientUpdate(is_active=False))
+    await crud.client.update(db, db_obj=obj, obj_in=ClientUpdate(is_active=False))
+    await crud.client.update_many(db, changes={"is_active": False}, ids=ids[:3])
+    await crud.client.remove_many(db, ids=ids[2:3])
+
+    expected = {"total": 3, "active": 1, "inactive": 2, "new_this_week": 3, "new_this_month": 3}
+    assert await crud.client.stats(db, owner_id=owner_id) == expected
+
+    await db.execute(
+        update(ClientCount).where(ClientCount.owner_id == owner_id).values(count=99, active=0)
+    )
+    await db.execute(delete(ClientDailyCount).where(ClientDailyCount.owner_id == owner_id))
+    await db.commit()
+    assert await crud.client.rebuild_stats(db, batch_size=2) >= 1
+    assert await crud.client.stats(db, owner_id=owner_id) == expected
+
+
+async def test_search_ranks_a_bounded_window_on_postgresql() -> None:
+    from unittest.mock import AsyncMock, MagicMock
+
+    from sqlalchemy.dialects import postgresql
+
+    from app.crud.client import SEARCH_CANDIDATES
+
+    db = MagicMock()
+    db.get_bind.return_value.dialect = postgresql.dialect()
+    db.execute = AsyncMock(return_value=MagicMock())
+    await crud.client.search(db, q="alpha", limit=5)
+    query = db.execute.call_args.args[0]
+    sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    # Only the candidate window is ranked, however many rows match
+    assert f"LIMIT {SEARCH_CANDIDATES})" in sql
+    assert sql.index(f"LIMIT {SEARCH_CANDIDATES}") < sql.index("ORDER BY ts_rank")
+    assert sql.endswith("LIMIT 5")
+
+
+async def test_search_ignores_short_terms() -> None:
+    from unittest.mock import AsyncMock, MagicMock
+
+    from sqlalchemy.dialects import postgresql
+
+    db = MagicMock()
+    db.get_bind.return_value.dialect = postgresql.dialect()
+    db.execute = AsyncMock(return_value=MagicMock())
+    assert await crud.client.search(db, q="a b cd") == []
+    db.execute.assert_not_called()
+
+    await crud.client.search(db, q="a alpha")
+    params = db.execute.call_args.args[0].compile(dialect=postgresql.dialect()).params
+    assert "'alpha':*" in params.values()
@@ -0,0 +1,66 @@
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.security import create_access_token
+from app.db import session
+from app.db.session import ReplicaSet
+
+
+async def _database(path: str, name: str):
+    db_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with db_engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE marker (name TEXT)"))
+        await conn.execute(text("INSERT INTO marker VALUES (:name)"), {"name": name})
+    return db_engine
+
+
+def _request(user_id: Optional[int] = None) -> Request:
+    headers = []
+    if user_id is not None:
+        headers.append((b"authorization", f"Bearer {create_access_token(user_id)}".encode()))
+    return Request({"type": "http", "headers": headers})
+
+
+async def _read_from(request: Request) -> str:
+    async for db in session.get_read_db(request):
+        return (await db.execute(text("SELECT name FROM marker"))).scalar()
+
+
+async def test_reads_are_routed_to_healthy_replicas(tmp_path, monkeypatch) -> None:
+    primary = await _database(tmp_path / "primary.db", "primary")
+    replica = await _database(tmp_path / "replica.db", "replica")
+    missing = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/replica.db")
+    replicas = ReplicaSet([missing, replica], stickiness=60)
+    monkeypatch.setattr(session, "replicas", replicas)
+    monkeypatch.setattr(
+        session, "AsyncSessionLocal", sessionmaker(primary, class_=AsyncSession)
+    )
+
+    # An unreachable replica is taken out of rotation on first use
+    assert {await _read_from(_request()) for _ in range(3)} == {"replica"}
+    assert replicas.healthy == [False, True]
+    await replicas.check()
+    assert replicas.healthy == [False, True]
+
+    # A caller who just wrote reads from the primary; others don't
+    writes = session.get_db(_request(1))
+    db = await writes.__anext__()
+    await db.execute(text("INSERT INTO marker VALUES ('written')"))
+    await db.commit()
+    # Sticky as of the commit, before the response is sent
+    assert await _read_from(_request(1)) == "primary"
+    async for _ in writes:
+        pass
+    assert await _read_from(_request(2)) == "replica"
+
+    # With every replica down, reads fall back to the primary
+    replicas.mark_down(replica)
+    assert await _read_from(_request(2)) == "primary"
+    assert replicas.fallbacks == 1
+
+    for db_engine in (primary, replica, missing):
+        await db_engine.dispose()
@@ -0,0 +1,84 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.core.config import settings
+from app.core.instrumentation import outbox_lag
+from app.jobs.outbox import OutboxWorker
+from app.models.outbox_event import OutboxEvent
+from app.schemas.client import ClientCreate, ClientUpdate
+from app.schemas.user import UserCreate
+
+
+def _worker(db: AsyncSession) -> OutboxWorker:
+    return OutboxWorker(lambda: AsyncSession(db.bind, expire_on_commit=False))
+
+
+async def _events(db: AsyncSession, client_id: int):
+    result = await db.execute(select(OutboxEvent).order_by(OutboxEvent.id))
+    return [e for e in result.scalars().all() if e.payload["id"] == client_id]
+
+
+async def test_client_writes_record_outbox_events(db: AsyncSession) -> None:
+    owner = await crud.user.create(
+        db, obj_in=UserCreate(email="outbox-owner@example.com", password="secret")
+    )
+    obj = await crud.client.create(
+        db, obj_in=ClientCreate(name="Outbox", email="outbox@example.com"), created_by=owner.id
+    )
+    await crud.client.update(db, db_obj=obj, obj_in=ClientUpdate(phone="555"))
+    await crud.client.remove(db, id=obj.id)
+
+    events = await _events(db, obj.id)
+    assert [e.topic for e in events] == ["client.created", "client.updated", "client.deleted"]
+    assert events[1].payload == {"id": obj.id, "created_by": owner.id, "fields": ["phone"]}
+
+
+async def test_worker_delivers_and_deletes_events(db: AsyncSession, monkeypatch) -> None:
+    # Sessions of the in-memory test database share one connection, so
+    # concurrent deliveries would roll back each other's deletes
+    monkeypatch.setattr(settings, "OUTBOX_CONCURRENCY", 1)
+    obj = await crud.client.create(
+        db, obj_in=ClientCreate(name="Delivered", email="delivered@example.com"), created_by=1
+    )
+    received = []
+
+    async def handler(event: OutboxEvent) -> None:
+        received.append((event.topic, event.payload["id"]))
+
+    worker = _worker(db)
+    worker.subscribe("client.*", handler)
+    while await worker.run_once():
+        pass
+
+    assert ("client.created", obj.id) in received
+    assert await _events(db, obj.id) == []
+    assert worker.stats()["delivered"] >= 1
+    assert "outbox_delivery_lag_seconds_count{topic=\"client.created\"}" in "\n".join(
+        outbox_lag.render()
+    )
+
+
+async def test_worker_retries_then_gives_up(db: AsyncSession, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(settings, "OUTBOX_RETRY_BASE_SECONDS", 0)
+    obj = await crud.client.create(
+        db, obj_in=ClientCreate(name="Failing", email="failing@example.com"), created_by=1
+    )
+
+    async def handler(event: OutboxEvent) -> None:
+        raise RuntimeError("webhook down")
+
+    worker = _worker(db)
+    worker.subscribe("client.created", handler)
+    await worker.run_once()
+    [event] = await _events(db, obj.id)
+    await db.refresh(event)
+    assert event.attempts == 1 and event.failed_at is None
+    assert event.last_error == "RuntimeError: webhook down"
+
+    await worker.run_once()
+    await db.refresh(event)
+    assert event.attempts == 2 and event.failed_at is not None
+    assert worker.stats()["retried"] >= 1 and worker.stats()["failed"] >= 1
+    assert (await worker.backlog(db))["failed"] >= 1